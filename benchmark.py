@@ -0,0 +1,222 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from statistics import mean, median
+from typing import Callable, Dict, List, Tuple
+
+from evaluation import load_answers, simulate
+from lexicon import get_lexicon
+from solver import CSPSolver, STRATEGIES
+from wordle_game import generate_wordle_feedback
+
+# Bump when benchmark definitions change in a way that makes old result files incomparable
+BENCHMARK_VERSION = 1
+
+
+def time_calls(setup: Callable[[], object], call: Callable[[object], object], runs: int) -> List[float]:
+    """Time call(state) runs times; setup() builds a fresh state before each run and is not timed."""
+    timings = []
+    for _ in range(runs):
+        state = setup()
+        start = time.perf_counter()
+        call(state)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def stats(timings: List[float], ops_per_run: int = 1) -> Dict[str, float]:
+    """Per-operation statistics of a list of run timings."""
+    per_op = [t / ops_per_run for t in timings]
+    return {
+        'median_s': median(per_op),
+        'min_s': min(per_op),
+        'mean_s': mean(per_op),
+        'runs': len(per_op),
+    }
+
+
+def sample_turns(solver: CSPSolver, targets: List[str]) -> List[Tuple[List[Tuple[str, List[str]]], str, List[str]]]:
+    """(history before the turn, guess, feedback) for the first two turns of each target's game."""
+    turns = []
+    for target in targets:
+        solver.reset()
+        history = []
+        for _ in range(2):
+            guess = solver.solve_csp()
+            if guess is None:
+                break
+            feedback = generate_wordle_feedback(target, guess)
+            turns.append((list(history), guess, feedback))
+            solver.incorporate_feedback(guess, feedback)
+            history.append((guess, feedback))
+            if all(f == 'GREEN' for f in feedback):
+                break
+    return turns
+
+
+def micro_benchmarks(letters_number: int, engine: str, strategy: str, runs: int) -> Dict[str, dict]:
+    """Benchmarks of the individual solver hot paths on one word length."""
+    lexicon = get_lexicon(letters_number)
+    rng = random.Random(letters_number)
+    solver = CSPSolver.from_index(lexicon, engine=engine, strategy=strategy)
+    targets = rng.sample(lexicon.words, min(20, len(lexicon.words)))
+    turns = sample_turns(solver, targets)
+    pairs = [(rng.choice(lexicon.words), rng.choice(lexicon.words)) for _ in range(1000)]
+
+    def at(turn):
+        # Restore the solver to the state right before a sampled turn
+        history, guess, feedback = turn
+
+        def setup():
+            solver.reset()
+            for g, f in history:
+                solver.incorporate_feedback(g, f)
+            return guess, feedback
+        return setup
+
+    prefix = f'{letters_number}letter'
+    results = {}
+
+    results[f'{prefix}.generate_wordle_feedback'] = stats(
+        time_calls(lambda: pairs, lambda ps: [generate_wordle_feedback(t, g) for t, g in ps], runs), len(pairs))
+    # the batched equivalent, reported per feedback so it reads against the scalar number
+    from patterns import feedback_codes
+    results[f'{prefix}.feedback_codes'] = stats(
+        time_calls(lambda: pairs[0][1], lambda g: feedback_codes(g, lexicon.letter_matrix), runs), len(lexicon.words))
+
+    for name, call in (
+        ('_update_counts_from_feedback', lambda gf: solver._update_counts_from_feedback(*gf)),
+        ('_apply_feedback_to_domains', lambda gf: solver._apply_feedback_to_domains(*gf)),
+        ('incorporate_feedback', lambda gf: solver.incorporate_feedback(*gf)),
+    ):
+        timings = []
+        for turn in turns:
+            timings.extend(time_calls(at(turn), call, max(1, runs // len(turns))))
+        results[f'{prefix}.{name}'] = stats(timings)
+
+    # First turn (full lexicon) and second turn (narrowed) are timed separately
+    first_turns = [t for t in turns if not t[0]]
+    later_turns = [t for t in turns if t[0]]
+    for label, group in (('turn1', first_turns), ('turn2', later_turns)):
+        if not group:
+            continue
+        for name, call in (
+            ('candidate_words', lambda _: solver.candidate_words()),
+            ('solve_csp', lambda _: solver.solve_csp()),
+        ):
+            timings = []
+            for turn in group[:5]:
+                timings.extend(time_calls(at(turn), call, max(1, runs // 5)))
+            results[f'{prefix}.{name}.{label}'] = stats(timings)
+
+    return results
+
+
+def macro_benchmarks(letters_number: int, engine: str, strategy: str, limit: int) -> Dict[str, dict]:
+    """Full simulation over the first `limit` answers of the n-letter answer list."""
+    answers = load_answers(f'word_lists/wordle_answers_{letters_number}letter.txt')[:limit]
+    # build the lexicon first so the simulation timing is not dominated by loading it
+    get_lexicon(letters_number)
+    results = simulate(answers, engine=engine, strategy=strategy)
+    entry = stats([results['total_time_seconds']], results['total'])
+    entry['games_per_second'] = results['total'] / results['total_time_seconds'] if results['total_time_seconds'] else 0.0
+    entry['winrate_percent'] = results['winrate_percent']
+    entry['average_guesses_on_wins'] = results['average_guesses_on_wins']
+    return {f'{letters_number}letter.simulate': entry}
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[dict]:
+    """Per-benchmark median ratio current/baseline, classified against threshold."""
+    rows = []
+    for name, entry in current['benchmarks'].items():
+        base = baseline.get('benchmarks', {}).get(name)
+        if base is None or not base.get('median_s'):
+            rows.append({'name': name, 'status': 'new', 'ratio': None})
+            continue
+        ratio = entry['median_s'] / base['median_s']
+        if ratio > 1 + threshold:
+            status = 'REGRESSION'
+        elif ratio < 1 - threshold:
+            status = 'faster'
+        else:
+            status = 'same'
+        rows.append({'name': name, 'status': status, 'ratio': ratio,
+                     'baseline_s': base['median_s'], 'current_s': entry['median_s']})
+    return rows
+
+
+def print_report(rows: List[dict], threshold: float) -> int:
+    """Print the comparison table and return the number of regressions."""
+    print(f"\nComparison against baseline (threshold ±{threshold * 100:.0f}% on median time):")
+    width = max((len(r['name']) for r in rows), default=10)
+    for r in rows:
+        if r['ratio'] is None:
+            print(f"  {r['name']:<{width}}  (no baseline)")
+            continue
+        print(f"  {r['name']:<{width}}  {r['baseline_s'] * 1e6:>12.2f} µs -> {r['current_s'] * 1e6:>12.2f} µs"
+              f"  x{r['ratio']:.2f}  {r['status']}")
+    regressions = sum(r['status'] == 'REGRESSION' for r in rows)
+    print(f"\n{regressions} regression(s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark feedback, filtering, solving and full simulations')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--engine', type=str, default='python', choices=['python', 'numpy', 'bitset'])
+    parser.add_argument('--strategy', type=str, default='frequency', choices=list(STRATEGIES))
+    parser.add_argument('--runs', type=int, default=50, help='Timed runs per micro-benchmark')
+    parser.add_argument('--limit', type=int, default=100, help='Answers per macro simulation')
+    parser.add_argument('--only', choices=['micro', 'macro'], help='Run only one group of benchmarks')
+    parser.add_argument('--out', type=str, default='bench_results.json', help='Where to write the JSON results')
+    parser.add_argument('--baseline', type=str, help='Earlier results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on regressions')
+    args = parser.parse_args()
+
+    benchmarks = {}
+    for n in args.letters_number:
+        if args.only != 'macro':
+            print(f"Running {n}-letter micro-benchmarks...")
+            benchmarks.update(micro_benchmarks(n, args.engine, args.strategy, args.runs))
+        if args.only != 'micro':
+            print(f"Running {n}-letter simulation ({args.limit} games)...")
+            benchmarks.update(macro_benchmarks(n, args.engine, args.strategy, args.limit))
+
+    current = {
+        'version': BENCHMARK_VERSION,
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'engine': args.engine,
+            'strategy': args.strategy,
+            'runs': args.runs,
+            'limit': args.limit,
+        },
+        'benchmarks': benchmarks,
+    }
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nSaved benchmark results to {args.out}")
+
+    for name, entry in benchmarks.items():
+        print(f"  {name:<45} median {entry['median_s'] * 1e6:>12.2f} µs")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('version') != BENCHMARK_VERSION:
+            print(f"Warning: baseline was written by benchmark version {baseline.get('version')}, "
+                  f"current is {BENCHMARK_VERSION}; results may not be comparable.")
+        regressions = print_report(compare(current, baseline, args.threshold), args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
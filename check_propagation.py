@@ -0,0 +1,81 @@
+import argparse
+import random
+import sys
+from typing import List, Optional, Tuple
+
+from lexicon import get_lexicon
+from solver import CSPSolver
+from wordle_game import generate_wordle_feedback
+
+# Fuzz check for propagation.py: the rules must only drop values no consistent word can use.
+# Random guess/feedback histories are played on a normal solver and, in parallel, on a reference
+# solver that only applies the per-guess pruning (no propagation). The candidates must be the
+# same after every turn, and an inconsistency may only be raised once no word matches any more.
+
+
+def random_history(words: List[str], rng: random.Random, max_steps: int,
+                   switch: float) -> List[Tuple[str, List[str]]]:
+    """Random guesses with their feedback; each step switches to another target with probability
+    switch, so some histories are contradictory."""
+    target = rng.choice(words)
+    history = []
+    for _ in range(rng.randint(1, max_steps)):
+        if rng.random() < switch:
+            target = rng.choice(words)
+        guess = rng.choice(words)
+        history.append((guess, generate_wordle_feedback(target, guess)))
+    return history
+
+
+def check_history(history: List[Tuple[str, List[str]]], letters_number: int, engine: str) -> Optional[str]:
+    """None when the propagating solver agrees with the reference on history, else what went wrong."""
+    solver = CSPSolver(letters_number, engine=engine)
+    reference = CSPSolver(letters_number)
+    expected = list(reference.lexicon.words)
+    for turn, (guess, feedback) in enumerate(history):
+        reference._update_counts_from_feedback(guess, feedback)
+        reference._apply_feedback_to_domains(guess, feedback)
+        expected = [w for w in expected if reference._word_matches_domains_and_counts(w)]
+        try:
+            solver.incorporate_feedback(guess, feedback)
+        except ValueError as e:
+            if expected:
+                return f"turn {turn}: raised '{e}' with {len(expected)} matching words"
+            return None
+        got = solver.candidate_words()
+        if got != expected:
+            return f"turn {turn}: {len(got)} candidates instead of {len(expected)}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzz-check that constraint propagation keeps the candidate sets')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--engine', type=str, default='python', choices=['python', 'numpy', 'bitset'])
+    parser.add_argument('--histories', type=int, default=300, help='Random histories per word length')
+    parser.add_argument('--max-steps', type=int, default=6, help='Longest history')
+    parser.add_argument('--switch', type=float, default=0.3,
+                        help='Chance per step of taking feedback from another target (contradictions)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    for n in args.letters_number:
+        words = list(get_lexicon(n).words)
+        for _ in range(args.histories):
+            history = random_history(words, rng, args.max_steps, args.switch)
+            problem = check_history(history, n, args.engine)
+            if problem is not None:
+                failures += 1
+                print(f"✗ {n} letters, {[g for g, _ in history]}: {problem}")
+        print(f"Checked {args.histories} {n}-letter histories")
+
+    if failures:
+        print(f"{failures} histories disagree")
+        sys.exit(1)
+    print(f"✓ Propagation kept every candidate set ({args.engine} engine)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+import argparse
+import gzip
+import json
+import os
+from collections import defaultdict
+from typing import List, Dict, Optional, Sequence
+
+from lexicon import LexiconIndex, get_lexicon, word_list_hash
+from opening_book import strategy_signature
+from solver import CSPSolver, STRATEGIES
+from wordle_game import encode_feedback, decode_pattern
+
+# Bump whenever the file layout or the meaning of a node changes so stale trees are recompiled
+DECISION_TREE_VERSION = 1
+DECISION_TREE_DIR = 'decision_trees'
+# Trees keep expanding past the usual 6 guesses so they also serve larger --max-guesses values
+MAX_TREE_DEPTH = 12
+
+
+class DecisionTree:
+    """Compiled game tree of one strategy: node -> guess, and (node, feedback code) -> child node.
+
+    Nodes are stored as two flat lists indexed by node id; the root is node 0. A node whose guess
+    is None is one where the solver found no candidate.
+    """
+    root = 0
+
+    def __init__(self, letters_number: int, strategy: str, fingerprint: str, answers_hash: str,
+                 guesses: List[Optional[str]], children: List[Dict[int, int]]):
+        self.letters_number = letters_number
+        self.strategy = strategy
+        self.signature = strategy_signature(strategy)
+        self.fingerprint = fingerprint
+        self.answers_hash = answers_hash
+        self.guesses = guesses
+        self.children = children
+
+    def __len__(self) -> int:
+        return len(self.guesses)
+
+    def check_compatible(self, lexicon: LexiconIndex) -> None:
+        if lexicon.letters_number != self.letters_number or lexicon.fingerprint != self.fingerprint:
+            raise ValueError("Decision tree was compiled for a different word list; recompile it.")
+
+    def to_json(self) -> dict:
+        return {
+            'version': DECISION_TREE_VERSION,
+            'letters_number': self.letters_number,
+            'strategy': self.strategy,
+            'signature': self.signature,
+            'word_list_hash': self.fingerprint,
+            'answers_hash': self.answers_hash,
+            'guesses': self.guesses,
+            'children': [{str(code): child for code, child in sorted(c.items())} for c in self.children],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'DecisionTree':
+        children = [{int(code): child for code, child in c.items()} for c in data['children']]
+        return cls(data['letters_number'], data['strategy'], data['word_list_hash'], data['answers_hash'],
+                   data['guesses'], children)
+
+
+def compile_tree(letters_number: int, strategy: str = 'frequency', answers: Optional[Sequence[str]] = None,
+                 max_depth: int = MAX_TREE_DEPTH) -> DecisionTree:
+    """Walk every game of strategy over answers (default: the whole word list) and record the tree."""
+    from patterns import all_green_code, feedback_codes
+
+    lexicon = get_lexicon(letters_number)
+    answers = list(answers) if answers is not None else list(lexicon.words)
+    solver = CSPSolver.from_index(lexicon, engine='bitset', strategy=strategy)
+    solved_code = all_green_code(letters_number)
+
+    guesses: List[Optional[str]] = [None]
+    children: List[Dict[int, int]] = [{}]
+    # (node id, parent's solver snapshot, (guess, feedback) leading here or None at the root,
+    # answers still possible there); each node applies one feedback instead of its whole history
+    work = [(DecisionTree.root, solver.snapshot(), None, answers)]
+    while work:
+        node, state, step, targets = work.pop()
+        solver.restore(state)
+        if step is not None:
+            solver.incorporate_feedback(*step)
+        guess = solver.solve_csp()
+        guesses[node] = guess
+        if guess is None or len(solver.guesses) + 1 >= max_depth:
+            continue
+        state = solver.snapshot()
+
+        groups = defaultdict(list)
+        for target, code in zip(targets, feedback_codes(guess, targets).tolist()):
+            groups[code].append(target)
+        for code in sorted(groups):
+            if code == solved_code:
+                continue
+            child = len(guesses)
+            guesses.append(None)
+            children.append({})
+            children[node][code] = child
+            work.append((child, state, (guess, decode_pattern(code, letters_number)), groups[code]))
+
+    return DecisionTree(letters_number, strategy, lexicon.fingerprint, word_list_hash(answers), guesses, children)
+
+
+def decision_tree_path(letters_number: int, strategy: str, answers_hash: str,
+                       tree_dir: str = DECISION_TREE_DIR) -> str:
+    return os.path.join(tree_dir, f'tree_{letters_number}letter_{strategy}_{answers_hash[:16]}.json.gz')
+
+
+def save_decision_tree(tree: DecisionTree, path: str) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(tree.to_json(), f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def load_decision_tree(letters_number: int, strategy: str = 'frequency', answers: Optional[Sequence[str]] = None,
+                       tree_dir: str = DECISION_TREE_DIR, rebuild: bool = False) -> DecisionTree:
+    """Load the compiled tree, recompiling it when missing or when the word list or strategy changed."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+    lexicon = get_lexicon(letters_number)
+    answers_hash = word_list_hash(answers if answers is not None else lexicon.words)
+    path = decision_tree_path(letters_number, strategy, answers_hash, tree_dir)
+
+    if not rebuild and os.path.exists(path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('version') == DECISION_TREE_VERSION
+                and data.get('word_list_hash') == lexicon.fingerprint
+                and data.get('signature') == strategy_signature(strategy)):
+            return DecisionTree.from_json(data)
+
+    tree = compile_tree(letters_number, strategy, answers)
+    save_decision_tree(tree, path)
+    return tree
+
+
+class TreeSolver:
+    """Plays from a compiled DecisionTree with one dict lookup per turn.
+
+    Exposes the same interface as CSPSolver. Once a history leaves the tree (a target outside the
+    compiled answer list, or a guess the tree would not make), a CSPSolver with the tree's strategy
+    replays the history and takes over for the rest of the game. book and cache are handed to
+    that fallback solver.
+    """
+
+    def __init__(self, tree: DecisionTree, lexicon: Optional[LexiconIndex] = None, engine: str = 'python',
+                 book=None, cache=None):
+        self.tree = tree
+        self.letters_number = tree.letters_number
+        self.lexicon = lexicon if lexicon is not None else get_lexicon(tree.letters_number)
+        tree.check_compatible(self.lexicon)
+        self.strategy = tree.strategy
+        self._fallback_options = {'engine': engine, 'strategy': tree.strategy, 'book': book, 'cache': cache}
+        self._fallback: Optional[CSPSolver] = None
+        # How the last solve_csp call went, as for CSPSolver
+        self.last_search: Optional[dict] = None
+        self.reset()
+
+    def reset(self) -> None:
+        # Current tree node, None once the game has left the tree
+        self.node: Optional[int] = self.tree.root
+        self.guesses: List[str] = []
+        self.feedbacks: List[List[str]] = []
+        # True while the fallback solver is in sync with the history
+        self._fallback_active = False
+
+    def snapshot(self) -> tuple:
+        """Capture the game state, with the fallback solver's when it is in use (see CSPSolver.snapshot)."""
+        return (self.node, tuple(self.guesses), tuple(tuple(f) for f in self.feedbacks),
+                self._fallback.snapshot() if self._fallback_active else None)
+
+    def restore(self, state: tuple) -> None:
+        """Return to a state captured by snapshot()."""
+        node, guesses, feedbacks, fallback_state = state
+        self.node = node
+        self.guesses = list(guesses)
+        self.feedbacks = [list(f) for f in feedbacks]
+        self._fallback_active = fallback_state is not None
+        if fallback_state is not None:
+            if self._fallback is None:
+                self._fallback = CSPSolver.from_index(self.lexicon, **self._fallback_options)
+            self._fallback.restore(fallback_state)
+
+    def _solver(self) -> CSPSolver:
+        """Fallback CSPSolver brought up to date with the game so far."""
+        if self._fallback is None:
+            self._fallback = CSPSolver.from_index(self.lexicon, **self._fallback_options)
+        if not self._fallback_active:
+            self._fallback.reset()
+            for guess, feedback in zip(self.guesses, self.feedbacks):
+                self._fallback.incorporate_feedback(guess, feedback)
+            self._fallback_active = True
+        return self._fallback
+
+    def solve_csp(self, deadline_ms: Optional[float] = None) -> Optional[str]:
+        if self.node is not None:
+            self.last_search = {'completed': True, 'stage': 'tree', 'elapsed_ms': 0.0}
+            return self.tree.guesses[self.node]
+        solver = self._solver()
+        guess = solver.solve_csp(deadline_ms)
+        self.last_search = solver.last_search
+        return guess
+
+    def incorporate_feedback(self, guess: str, feedback: List[str]) -> None:
+        if self.node is not None and guess == self.tree.guesses[self.node]:
+            self.node = self.tree.children[self.node].get(encode_feedback(feedback))
+        else:
+            self.node = None
+        self.guesses.append(guess)
+        self.feedbacks.append(list(feedback))
+        if self._fallback_active:
+            self._fallback.incorporate_feedback(guess, feedback)
+
+    def candidate_words(self) -> List[str]:
+        return self._solver().candidate_words()
+
+    def candidate_count(self) -> int:
+        return self._solver().candidate_count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile full decision trees for fixed word lists')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--strategy', type=str, nargs='+', default=['frequency'], choices=list(STRATEGIES))
+    parser.add_argument('--answers', type=str,
+                        help='Answer list template, e.g. word_lists/wordle_answers_{n}letter.txt '
+                             '(default: the full valid word list)')
+    parser.add_argument('--tree-dir', type=str, default=DECISION_TREE_DIR)
+    parser.add_argument('--rebuild', action='store_true', help='Recompile even if an up-to-date tree exists')
+    args = parser.parse_args()
+
+    for n in args.letters_number:
+        answers = None
+        if args.answers:
+            with open(args.answers.format(n=n), 'r', encoding='utf-8') as f:
+                answers = [w.strip() for w in f if w.strip()]
+        for strategy in args.strategy:
+            tree = load_decision_tree(n, strategy, answers, tree_dir=args.tree_dir, rebuild=args.rebuild)
+            print(f"✓ {n}-letter {strategy} tree: {len(tree):,} nodes -> "
+                  f"{decision_tree_path(n, strategy, tree.answers_hash, args.tree_dir)}")
+
+
+if __name__ == '__main__':
+    main()
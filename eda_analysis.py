@@ -1,16 +1,16 @@
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
+import argparse
+import hashlib
+import json
 import os
-from collections import Counter
 
-from utils import load_valid_words
+from utils import load_valid_words, load_word_file
 
 def load_words(filepath='word_lists/valid_words.txt'):
     """Load all valid words from the dataset"""
-    with open(filepath, 'r') as file:
-        words = [line.strip().lower() for line in file.readlines()]
-    return words
+    return load_word_file(filepath)
 def separate_by_length():
     """Separate words into 5, 6, and 7-letter categories"""
     words_5 = load_valid_words(5)
@@ -18,24 +18,93 @@ def separate_by_length():
     words_7 = load_valid_words(7)
     return words_5, words_6, words_7
 
-def calculate_position_frequencies(words, word_length):
-    """Calculate letter frequency for each position"""
-    freq_matrix = np.zeros((word_length, 26))
-    
-    for word in words:
-        for pos, letter in enumerate(word):
-            if letter.isalpha():
-                letter_idx = ord(letter) - ord('a')
-                freq_matrix[pos][letter_idx] += 1
-    
-    for pos in range(word_length):
-        total = freq_matrix[pos].sum()
-        if total > 0:
-            freq_matrix[pos] = (freq_matrix[pos] / total) * 100
-    
+# Bytes a word line may start or end with; load_valid_words / load_words strip them
+_WHITESPACE = np.frombuffer(b' \t\r\x0b\x0c', dtype=np.uint8)
+
+
+def read_word_bytes(*paths):
+    """Raw bytes of one or more one-word-per-line files, with a line break between files."""
+    chunks = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        chunks.append(data if data.endswith(b'\n') or not data else data + b'\n')
+    return b''.join(chunks)
+
+
+def letter_statistics(data, lengths=(5, 6, 7)):
+    """Letter statistics of a one-word-per-line byte buffer, computed in one vectorized pass.
+
+    Returns a dict with
+      'words':      number of lines
+      'by_length':  {n: number of n-letter words} for n in lengths
+      'positions':  {n: (n, 26) counts of each letter a-z at each position of the n-letter words}
+      'chars':      (256,) counts of every (lowercased) character over all words
+      'first_seen': character codes ordered by first appearance, like a Counter over the words
+    Whitespace around a word is ignored, as in load_words; uppercase letters are only folded
+    for 'chars' (load_valid_words keeps the case, so they are not counted per position).
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    newline = buf == ord('\n')
+    line_of_byte = np.cumsum(newline) - newline
+    kept = np.flatnonzero(~newline & ~np.isin(buf, _WHITESPACE))
+    chars = buf[kept]
+    line_of = line_of_byte[kept]
+    n_lines = int(newline.sum()) + (0 if len(buf) == 0 or buf[-1] == ord('\n') else 1)
+    line_length = np.bincount(line_of, minlength=n_lines)
+    # Lines are in order, so a character's position is its rank among its line's kept bytes
+    line_start = np.cumsum(line_length) - line_length
+    position = np.arange(len(kept)) - line_start[line_of]
+
+    # One bincount over (length slot, position, letter) covers every requested length
+    lengths = sorted(lengths)
+    offsets = {}
+    slot = np.full(max(lengths, default=0) + 2, -1, dtype=np.int64)
+    cells = 0
+    for n in lengths:
+        offsets[n] = cells
+        slot[n] = cells
+        cells += n * 26
+    char_length = np.minimum(line_length[line_of], len(slot) - 1)
+    letter = chars.astype(np.int64) - ord('a')
+    counted = (slot[char_length] >= 0) & (letter >= 0) & (letter < 26)
+    keys = slot[char_length[counted]] + position[counted] * 26 + letter[counted]
+    cell_counts = np.bincount(keys, minlength=cells)
+
+    lowered = np.where((chars >= ord('A')) & (chars <= ord('Z')), chars + 32, chars)
+    char_counts = np.bincount(lowered, minlength=256)
+    # Every character shows up early in a real word list, so look for first appearances in a
+    # prefix, growing it only while some character is still missing
+    end = 4096
+    while True:
+        seen, first_index = np.unique(lowered[:end], return_index=True)
+        if len(seen) == np.count_nonzero(char_counts) or end >= len(lowered):
+            break
+        end *= 4
+    return {
+        'words': n_lines,
+        'by_length': {n: int((line_length == n).sum()) for n in lengths},
+        'positions': {n: cell_counts[offsets[n]:offsets[n] + n * 26].reshape(n, 26) for n in lengths},
+        'chars': char_counts,
+        'first_seen': seen[np.argsort(first_index)].tolist(),
+    }
+
+
+def position_percentages(counts):
+    """(positions, 26) letter counts -> percentage of each letter at each position."""
+    freq_matrix = np.asarray(counts, dtype=np.float64)
+    totals = freq_matrix.sum(axis=1, keepdims=True)
+    used = totals[:, 0] > 0
+    freq_matrix[used] = (freq_matrix[used] / totals[used]) * 100
     return freq_matrix
 
 
+def calculate_position_frequencies(words, word_length):
+    """Calculate letter frequency for each position (of the words with word_length letters)"""
+    data = '\n'.join(words).encode('ascii')
+    return position_percentages(letter_statistics(data, (word_length,))['positions'][word_length])
+
+
 def alphabet_order_by_position(words=None, word_length=None, freq_matrix=None, uppercase=True):
     # Obtain freq_matrix if not provided
     if freq_matrix is None:
@@ -68,42 +137,45 @@ def alphabet_order_by_position(words=None, word_length=None, freq_matrix=None, u
 
 def plot_sorted_barchart_all_positions(freq_matrix, word_length, output_dir='eda_visualizations'):
     """Sorted bar charts for each position - much clearer than heatmap!"""
+    # Create one chart per position
+    for pos in range(word_length):
+        plot_position_barchart(freq_matrix[pos], pos, word_length, output_dir)
+
+def plot_position_barchart(pos_freq, pos, word_length, output_dir='eda_visualizations'):
+    """Sorted bar chart of the letter frequencies at one position"""
     os.makedirs(output_dir, exist_ok=True)
     
     letters = [chr(i) for i in range(ord('a'), ord('z')+1)]
     
-    # Create one chart per position
-    for pos in range(word_length):
-        fig, ax = plt.subplots(figsize=(14, 8))
-        
-        pos_freq = freq_matrix[pos]
-        # Sort by frequency (descending)
-        sorted_indices = np.argsort(pos_freq)[::-1]
-        sorted_letters = [letters[i].upper() for i in sorted_indices]
-        sorted_values = [pos_freq[i] for i in sorted_indices]
-        
-        # Color bars - highlight top 5
-        colors = ['#e74c3c' if i < 5 else '#3498db' for i in range(26)]
-        
-        bars = ax.bar(sorted_letters, sorted_values, color=colors)
-        ax.set_xlabel('Letter', fontsize=14, fontweight='bold')
-        ax.set_ylabel('Frequency (%)', fontsize=14, fontweight='bold')
-        ax.set_title(f'Letter Frequency at Position {pos+1} ({word_length}-Letter Words)', 
-                     fontsize=16, fontweight='bold')
-        ax.grid(axis='y', alpha=0.3)
-        
-        # Add value labels on top of bars for top 10
-        for i in range(min(10, len(bars))):
-            height = bars[i].get_height()
-            ax.text(bars[i].get_x() + bars[i].get_width()/2., height,
-                   f'{sorted_values[i]:.1f}%',
-                   ha='center', va='bottom', fontsize=9, fontweight='bold')
-        
-        plt.tight_layout()
-        filename = f'{output_dir}/barchart_pos{pos+1}_{word_length}letter.png'
-        plt.savefig(filename, dpi=300, bbox_inches='tight')
-        plt.close()
-        print(f"✓ Saved: {filename}")
+    fig, ax = plt.subplots(figsize=(14, 8))
+    
+    # Sort by frequency (descending)
+    sorted_indices = np.argsort(pos_freq)[::-1]
+    sorted_letters = [letters[i].upper() for i in sorted_indices]
+    sorted_values = [pos_freq[i] for i in sorted_indices]
+    
+    # Color bars - highlight top 5
+    colors = ['#e74c3c' if i < 5 else '#3498db' for i in range(26)]
+    
+    bars = ax.bar(sorted_letters, sorted_values, color=colors)
+    ax.set_xlabel('Letter', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Frequency (%)', fontsize=14, fontweight='bold')
+    ax.set_title(f'Letter Frequency at Position {pos+1} ({word_length}-Letter Words)', 
+                 fontsize=16, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    
+    # Add value labels on top of bars for top 10
+    for i in range(min(10, len(bars))):
+        height = bars[i].get_height()
+        ax.text(bars[i].get_x() + bars[i].get_width()/2., height,
+               f'{sorted_values[i]:.1f}%',
+               ha='center', va='bottom', fontsize=9, fontweight='bold')
+    
+    plt.tight_layout()
+    filename = f'{output_dir}/barchart_pos{pos+1}_{word_length}letter.png'
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.close()
+    print(f"✓ Saved: {filename}")
 
 def plot_all_positions_grid(freq_matrix, word_length, output_dir='eda_visualizations'):
     """Grid view of all positions - easier to compare"""
@@ -196,14 +268,15 @@ def plot_top_letters_per_position(freq_matrix, word_length, output_dir='eda_visu
     plt.close()
     print(f"✓ Saved: {filename}")
 
+def overall_frequency(stats):
+    """Percentage of each character over all words, from letter_statistics() output."""
+    counts = stats['chars']
+    total = int(counts.sum())
+    return {chr(c): (int(counts[c]) / total) * 100 for c in stats['first_seen']}
+
 def calculate_overall_frequency(words):
     """Calculate overall letter frequency"""
-    all_letters = ''.join(words)
-    counter = Counter(all_letters)
-    total = sum(counter.values())
-    
-    freq_dict = {letter: (count/total)*100 for letter, count in counter.items()}
-    return freq_dict
+    return overall_frequency(letter_statistics('\n'.join(words).encode('ascii'), ()))
 
 def plot_overall_frequency(freq_dict, output_dir='eda_visualizations'):
     """Bar chart of overall letter frequencies - SORTED by frequency"""
@@ -261,43 +334,135 @@ def save_frequency_matrix(freq_matrix, word_length, output_dir='eda_data'):
     df.to_csv(filename)
     print(f"✓ Saved frequency data: {filename}")
 
+# Bump when a plot function changes, so every figure is re-rendered once
+PLOT_VERSION = 1
+MANIFEST_NAME = '.manifest.json'
+
+
+def figure_jobs(freqs, overall_freq, output_dir='eda_visualizations'):
+    """(output file, plot function name, kwargs) for every EDA figure.
+
+    freqs: {word length: position frequency matrix}. Each job gets only the data its figure
+    shows, so e.g. a position bar chart depends on its own row of the matrix only.
+    """
+    jobs = []
+    for n, freq_matrix in freqs.items():
+        for pos in range(n):
+            jobs.append((f'{output_dir}/barchart_pos{pos+1}_{n}letter.png', 'plot_position_barchart',
+                         {'pos_freq': freq_matrix[pos], 'pos': pos, 'word_length': n, 'output_dir': output_dir}))
+    for n, freq_matrix in freqs.items():
+        jobs.append((f'{output_dir}/grid_view_{n}letter.png', 'plot_all_positions_grid',
+                     {'freq_matrix': freq_matrix, 'word_length': n, 'output_dir': output_dir}))
+    for n, freq_matrix in freqs.items():
+        jobs.append((f'{output_dir}/top_letters_{n}letter.png', 'plot_top_letters_per_position',
+                     {'freq_matrix': freq_matrix, 'word_length': n, 'output_dir': output_dir}))
+    jobs.append((f'{output_dir}/overall_frequency.png', 'plot_overall_frequency',
+                 {'freq_dict': overall_freq, 'output_dir': output_dir}))
+    return jobs
+
+
+def job_hash(func_name, kwargs):
+    """Content hash of a figure job: plot function, its input data and parameters."""
+    import matplotlib
+    h = hashlib.sha256(f'{PLOT_VERSION}|{matplotlib.__version__}|{func_name}'.encode())
+    for key in sorted(kwargs):
+        value = kwargs[key]
+        h.update(f'|{key}='.encode())
+        if isinstance(value, np.ndarray):
+            h.update(f'{value.dtype.str}{value.shape}'.encode())
+            h.update(np.ascontiguousarray(value).tobytes())
+        else:
+            # dicts keep their order: it decides how ties are sorted in the plot
+            h.update(json.dumps(value).encode())
+    return h.hexdigest()
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _init_render_worker():
+    plt.switch_backend('Agg')
+
+
+def _render_job(job):
+    filename, func_name, kwargs = job
+    globals()[func_name](**kwargs)
+    return filename
+
+
+def render_figures(jobs, workers=1, force=False, manifest_path=f'eda_visualizations/{MANIFEST_NAME}'):
+    """Render the figure jobs (see figure_jobs) across a process pool, skipping up-to-date ones.
+
+    A figure is up to date if its file exists and the manifest from the previous run recorded
+    the same job_hash for it. The manifest is rewritten with every rendered figure, also when
+    rendering is interrupted. Returns (rendered, skipped) counts.
+    """
+    manifest = {} if force else load_manifest(manifest_path)
+    hashes = {filename: job_hash(func_name, kwargs) for filename, func_name, kwargs in jobs}
+    todo = [job for job in jobs
+            if manifest.get(job[0]) != hashes[job[0]] or not os.path.exists(job[0])]
+    skipped = len(jobs) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} unchanged figures")
+
+    os.makedirs(os.path.dirname(manifest_path) or '.', exist_ok=True)
+    rendered = 0
+    try:
+        if workers > 1 and len(todo) > 1:
+            from multiprocessing import Pool
+            with Pool(min(workers, len(todo)), initializer=_init_render_worker) as pool:
+                for filename in pool.imap_unordered(_render_job, todo):
+                    manifest[filename] = hashes[filename]
+                    rendered += 1
+        else:
+            for job in todo:
+                manifest[_render_job(job)] = hashes[job[0]]
+                rendered += 1
+    finally:
+        save_manifest(manifest, manifest_path)
+    return rendered, skipped
+
 def main():
-    print("\nLoading word list")
-    words = load_words()
-    print(f"Total words: {len(words):,}")
-    
-    print("\nSeparating by length")
-    words_5, words_6, words_7 = separate_by_length()
-    print(f"5-letter words: {len(words_5):,}")
-    print(f"6-letter words: {len(words_6):,}")
-    print(f"7-letter words: {len(words_7):,}")
+    parser = argparse.ArgumentParser(description='Letter frequency statistics and figures of the word lists')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes rendering figures')
+    parser.add_argument('--force', action='store_true', help='Re-render every figure, even unchanged ones')
+    parser.add_argument('--output-dir', type=str, default='eda_visualizations')
+    args = parser.parse_args()
+
+    print("\nLoading word lists")
+    # Whole files go through letter_statistics as one byte buffer each: the filtered n-letter
+    # lists for the per-position tables, valid_words.txt for the overall frequencies
+    stats = letter_statistics(read_word_bytes(*[f'word_lists/valid_words_{n}letter.txt' for n in (5, 6, 7)]))
+    all_stats = letter_statistics(read_word_bytes('word_lists/valid_words.txt'), ())
+    print(f"Total words: {all_stats['words']:,}")
+    print(f"5-letter words: {stats['by_length'][5]:,}")
+    print(f"6-letter words: {stats['by_length'][6]:,}")
+    print(f"7-letter words: {stats['by_length'][7]:,}")
     
     print("\nCalculating position frequencies")
-    freq_5 = calculate_position_frequencies(words_5, 5)
-    freq_6 = calculate_position_frequencies(words_6, 6)
-    freq_7 = calculate_position_frequencies(words_7, 7)
+    freq_5, freq_6, freq_7 = (position_percentages(stats['positions'][n]) for n in (5, 6, 7))
     
     print("\nCalculating overall letter frequencies")
-    overall_freq = calculate_overall_frequency(words)
+    overall_freq = overall_frequency(all_stats)
     
     print("\nGenerating visualizations")
-    
-    print("Creating individual position bar charts...")
-    plot_sorted_barchart_all_positions(freq_5, 5)
-    plot_sorted_barchart_all_positions(freq_6, 6)
-    plot_sorted_barchart_all_positions(freq_7, 7)
-    
-    print("Creating grid views...")
-    plot_all_positions_grid(freq_5, 5)
-    plot_all_positions_grid(freq_6, 6)
-    plot_all_positions_grid(freq_7, 7)
-    
-    print("Creating top 5 comparison charts...")
-    plot_top_letters_per_position(freq_5, 5)
-    plot_top_letters_per_position(freq_6, 6)
-    plot_top_letters_per_position(freq_7, 7)
-    
-    plot_overall_frequency(overall_freq)
+    jobs = figure_jobs({5: freq_5, 6: freq_6, 7: freq_7}, overall_freq, args.output_dir)
+    rendered, skipped = render_figures(jobs, workers=args.workers, force=args.force,
+                                       manifest_path=f'{args.output_dir}/{MANIFEST_NAME}')
+    print(f"✓ Rendered {rendered} figures, {skipped} already up to date")
     
     print("\nSaving frequency data")
     save_frequency_matrix(freq_5, 5)
@@ -305,7 +470,7 @@ def main():
     save_frequency_matrix(freq_7, 7)
     
     print("\nEDA Complete!")
-    print("Visualizations saved to: eda_visualizations/")
+    print(f"Visualizations saved to: {args.output_dir}/")
     print("Frequency data saved to: eda_data/")
 
 if __name__ == "__main__":
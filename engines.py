@@ -0,0 +1,197 @@
+from typing import Dict, Iterator, List, Optional, TYPE_CHECKING
+
+from lexicon import LexiconIndex
+
+if TYPE_CHECKING:
+    from solver import CSPSolver
+
+
+# Candidate-filtering engines.
+# Every engine keeps the surviving candidates in its own representation ("live set") and knows how to
+# narrow it to the solver's current domains and min/max counts, count it and decode it back to words
+# (all of them, chunk by chunk, or just the first).
+# All engines must return candidates in word-list order so the solver's choices do not depend on the engine.
+
+class PythonEngine:
+    """Reference engine: a plain list of words checked one at a time."""
+    name = 'python'
+
+    def __init__(self, lexicon: LexiconIndex):
+        self.lexicon = lexicon
+
+    def initial(self) -> List[str]:
+        return list(self.lexicon.words)
+
+    def narrow(self, live: List[str], solver: 'CSPSolver') -> List[str]:
+        return [w for w in live if solver._word_matches_domains_and_counts(w)]
+
+    def count(self, live: List[str]) -> int:
+        return len(live)
+
+    def first(self, live: List[str]) -> Optional[str]:
+        return live[0] if live else None
+
+    def words(self, live: List[str]) -> List[str]:
+        return list(live)
+
+    def word_chunks(self, live: List[str], size: int) -> Iterator[List[str]]:
+        for start in range(0, len(live), size):
+            yield live[start:start + size]
+
+
+class NumpyEngine:
+    """Vectorized engine over the lexicon's (N, L) letter matrix and (N, 26) letter-count matrix.
+
+    Domains become an (L, 26) boolean mask and min/max counts two length-26 bound vectors, so
+    narrowing the live set of word ids is a handful of array operations.
+    """
+    name = 'numpy'
+
+    def __init__(self, lexicon: LexiconIndex):
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("The 'numpy' engine requires NumPy (pip install numpy).")
+        self.np = np
+        self.lexicon = lexicon
+        self.letters = lexicon.letter_matrix
+        self.counts = lexicon.count_matrix
+        self.positions = np.arange(lexicon.letters_number)
+
+    def initial(self):
+        return self.np.arange(len(self.lexicon.words), dtype=self.np.int32)
+
+    def _bounds(self, solver: 'CSPSolver'):
+        """(allowed, lo, hi), or None when some character outside a-z is required: lexicon words
+        never contain one, so nothing can match. Other characters outside a-z are ignored."""
+        np = self.np
+        allowed = np.zeros((self.lexicon.letters_number, 26), dtype=bool)
+        for i, domain in enumerate(solver.domains):
+            allowed[i, [ord(c) - ord('a') for c in domain if 'a' <= c <= 'z']] = True
+        lo = np.zeros(26, dtype=np.uint8)
+        for ch, m in solver.min_counts.items():
+            if 'a' <= ch <= 'z':
+                lo[ord(ch) - ord('a')] = m
+            elif m > 0:
+                return None
+        # Letters without an explicit max never occur in the lexicon, so they are left unbounded
+        hi = np.full(26, 255, dtype=np.uint8)
+        for ch, m in solver.max_counts.items():
+            if 'a' <= ch <= 'z':
+                hi[ord(ch) - ord('a')] = m
+        return allowed, lo, hi
+
+    def narrow(self, live, solver: 'CSPSolver'):
+        if live.size == 0:
+            return live
+        bounds = self._bounds(solver)
+        if bounds is None:
+            return live[:0]
+        allowed, lo, hi = bounds
+        rows = self.letters[live]
+        ok = allowed[self.positions, rows].all(axis=1)
+        counts = self.counts[live]
+        ok &= (counts >= lo).all(axis=1)
+        ok &= (counts <= hi).all(axis=1)
+        return live[ok]
+
+    def count(self, live) -> int:
+        return int(live.size)
+
+    def first(self, live) -> Optional[str]:
+        return self.lexicon.words[int(live[0])] if live.size else None
+
+    def words(self, live) -> List[str]:
+        words = self.lexicon.words
+        return [words[i] for i in live.tolist()]
+
+    def word_chunks(self, live, size: int) -> Iterator[List[str]]:
+        words = self.lexicon.words
+        for start in range(0, live.size, size):
+            yield [words[i] for i in live[start:start + size].tolist()]
+
+
+class BitsetEngine:
+    """Pure-Python engine over the lexicon's bitset postings (no NumPy needed).
+
+    The live set is one int with a bit per word id; narrowing is an AND/OR over a few
+    dozen postings and words are only decoded when candidate_words() asks for them.
+    """
+    name = 'bitset'
+
+    def __init__(self, lexicon: LexiconIndex):
+        self.lexicon = lexicon
+        self.postings = lexicon.postings
+
+    def initial(self) -> int:
+        return self.postings.all
+
+    def narrow(self, live: int, solver: 'CSPSolver') -> int:
+        postings = self.postings
+        for i, domain in enumerate(solver.domains):
+            # An untouched domain admits every word, skip the OR
+            if len(domain) == len(self.lexicon.domains[i]):
+                continue
+            allowed = 0
+            by_letter = postings.positions[i]
+            for c in domain:
+                allowed |= by_letter.get(c, 0)
+            live &= allowed
+        for ch, m in solver.min_counts.items():
+            if m > 0:
+                at_least = postings.at_least.get(ch, ())
+                live &= at_least[m] if m < len(at_least) else 0
+        for ch, m in solver.max_counts.items():
+            at_least = postings.at_least.get(ch, ())
+            if m + 1 < len(at_least):
+                live &= ~at_least[m + 1]
+        return live
+
+    def count(self, live: int) -> int:
+        return live.bit_count()
+
+    def first(self, live: int) -> Optional[str]:
+        # Lowest set bit: the first candidate in word-list order
+        return self.lexicon.words[(live & -live).bit_length() - 1] if live else None
+
+    def words(self, live: int) -> List[str]:
+        words = self.lexicon.words
+        # Reversed binary string: character i is bit i
+        bits = bin(live)[:1:-1]
+        result = []
+        i = bits.find('1')
+        while i != -1:
+            result.append(words[i])
+            i = bits.find('1', i + 1)
+        return result
+
+    def word_chunks(self, live: int, size: int) -> Iterator[List[str]]:
+        """Like words(), decoded lazily size words at a time."""
+        words = self.lexicon.words
+        bits = bin(live)[:1:-1]
+        chunk = []
+        i = bits.find('1')
+        while i != -1:
+            chunk.append(words[i])
+            if len(chunk) == size:
+                yield chunk
+                chunk = []
+            i = bits.find('1', i + 1)
+        if chunk:
+            yield chunk
+
+
+ENGINES: Dict[str, type] = {
+    'python': PythonEngine,
+    'numpy': NumpyEngine,
+    'bitset': BitsetEngine,
+}
+
+
+def make_engine(name: str, lexicon: LexiconIndex):
+    """Instantiate the candidate-filtering engine registered under name."""
+    try:
+        engine_cls = ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown engine '{name}'. Choose from: {', '.join(ENGINES)}")
+    return engine_cls(lexicon)
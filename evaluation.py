@@ -3,10 +3,12 @@ import csv
 import sys
 import time
 from collections import defaultdict
-from statistics import mean
+from typing import Optional
 
-from wordle_game import generate_wordle_feedback
-from solver import CSPSolver
+from wordle_game import generate_wordle_feedback, encode_feedback, decode_pattern
+from solver import CSPSolver, STRATEGIES
+from lexicon import get_lexicon
+from profiling import PhaseProfile, ProfileMerger
 
 
 def plot_distribution(distribution: dict, out_path: str = 'distribution.png', title: str = None):
@@ -80,66 +82,294 @@ def load_answers(path: str) -> list:
         return [w.strip() for w in f if w.strip()]
 
 
-def simulate(answers: list, max_guesses: int = 6, limit: int = None):
-    total = 0
-    wins = 0
-    guess_counts = []
-    distribution = defaultdict(int)
-    failed_words = []
-    game_times = []
+def play_game(solver: CSPSolver, target: str, max_guesses: int = 6, patterns=None) -> dict:
+    """Play one game against target with an already reset solver and return its record.
 
-    total_start = time.perf_counter()
-    for idx, target in enumerate(answers):
-        if limit and idx >= limit:
+    The record holds the guesses and their feedback as base-3 pattern codes (see
+    wordle_game.encode_feedback) besides the outcome and the elapsed time.
+    """
+    game_start = time.perf_counter()
+    attempts = 0
+    solved = False
+    guesses = []
+    feedback_codes = []
+
+    while attempts < max_guesses:
+        attempts += 1
+        guess = solver.solve_csp()
+        if guess is None:
+            # no candidate -> fail early
             break
-        total += 1
-        # measure single-game time
-        game_start = time.perf_counter()
-        # instantiate solver fresh for each target
 
-        solver = CSPSolver(letters_number=len(target))
-        guess_func = None
+        if patterns is not None:
+            feedback = patterns.feedback(target, guess)
+        else:
+            feedback = generate_wordle_feedback(target, guess)
+
+        # solver will record guess when incorporate_feedback is called
+        solver.incorporate_feedback(guess, feedback)
+        guesses.append(guess)
+        feedback_codes.append(encode_feedback(feedback))
+
+        if all(f == 'GREEN' for f in feedback):
+            solved = True
+            break
+
+    return {
+        'target': target,
+        'solved': solved,
+        'attempts': attempts,
+        'guesses': guesses,
+        'feedback': feedback_codes,
+        'time_seconds': time.perf_counter() - game_start,
+    }
+
+
+def make_solver(letters_number: int, engine: str = 'python', strategy: str = 'frequency', books: dict = None,
+                trees: dict = None, cache_size: int = 0):
+    """Solver for one word length: a TreeSolver when a compiled tree is given, else a CSPSolver.
+
+    cache_size: when > 0, the solver memoizes its guesses in the process-wide SolveCache (with a
+    tree, only the fallback solver used off the tree does).
+    """
+    lexicon = get_lexicon(letters_number)
+    book = (books or {}).get(letters_number)
+    tree = (trees or {}).get(letters_number)
+    cache = None
+    if cache_size > 0:
+        from solve_cache import get_solve_cache
+        cache = get_solve_cache(cache_size)
+    if tree is not None:
+        from decision_tree import TreeSolver
+        return TreeSolver(tree, lexicon=lexicon, engine=engine, book=book, cache=cache)
+    return CSPSolver.from_index(lexicon, engine=engine, strategy=strategy, book=book, cache=cache)
+
+
+def iter_games(answers: list, max_guesses: int = 6, patterns=None, solvers: dict = None, progress: bool = True,
+               solver_options: dict = None, profile: bool = False):
+    """Play every answer in order, yielding each game's record as soon as it finishes.
+
+    solver_options: keyword arguments for make_solver (engine, strategy, books, trees).
+    profile: attach a fresh PhaseProfile to the solver for each game and store it in the record.
+    """
+    solver_options = solver_options or {}
+    # one solver per word length, built on the shared lexicon and reset between games
+    solvers = {} if solvers is None else solvers
+    played = 0
+    wins = 0
+    for target in answers:
+        # measure single-game time, including the solver reset
+        reset_start = time.perf_counter()
+        # reuse the solver for this length; only its constraint state is reset
+        solver = solvers.get(len(target))
+        if solver is None:
+            solver = make_solver(len(target), **solver_options)
+            solvers[len(target)] = solver
+        else:
+            solver.reset()
+        if profile:
+            solver.profile = PhaseProfile()
+        reset_elapsed = time.perf_counter() - reset_start
+
+        record = play_game(solver, target, max_guesses=max_guesses, patterns=patterns)
+        record['time_seconds'] += reset_elapsed
+        if profile:
+            record['phases'] = solver.profile.to_dict()
+        played += 1
+        wins += record['solved']
+        yield record
+
+        # simple progress every 100 games
+        if progress and played % 100 == 0:
+            print(f"Simulated {played} games... wins so far: {wins}")
+
+
+def play_games(answers: list, **kwargs) -> list:
+    """List of the records of iter_games(answers, **kwargs)."""
+    return list(iter_games(answers, **kwargs))
+
+
+# Below this many targets a node computes feedback one pair at a time; NumPy's per-call
+# overhead only pays off for larger groups
+_SCALAR_GROUP = 16
+
+
+def iter_games_shared(answers: list, max_guesses: int = 6, patterns=None, progress: bool = True,
+                      solver_options: dict = None, time_cap: Optional[int] = None):
+    """Same records as iter_games, but every distinct solver state is computed only once.
+
+    The solver is deterministic, so all targets that have produced the same guess/feedback
+    history so far get the same next guess. Targets are therefore walked like a trie: each
+    node restores its parent's solver snapshot, applies its own feedback, picks one guess,
+    and splits its targets by the feedback they give. The work scales with the number of
+    distinct states instead of answers x guesses. A node's time is shared equally by its
+    targets. Records are yielded in answer order.
 
-        attempts = 0
-        solved = False
+    time_cap: records of games longer than this many guesses also get 'capped_time_seconds',
+    the time of their first time_cap guesses (see cap_record).
+    """
+    from patterns import all_green_code, feedback_codes
+
+    solver_options = solver_options or {}
+    by_length = defaultdict(list)
+    for i, target in enumerate(answers):
+        by_length[len(target)].append(i)
 
-        while attempts < max_guesses:
-            attempts += 1
+    # finished records waiting for an earlier answer to finish, by answer index
+    pending = {}
+    next_index = 0
+    wins = 0
+    for letters_number, indices in sorted(by_length.items()):
+        solver = make_solver(letters_number, **solver_options)
+        solved_code = all_green_code(letters_number)
+        # (parent snapshot, (guess, feedback) leading to this node or None, feedback codes so far,
+        #  answer indices, time charged per target, that time after time_cap guesses)
+        work = [(solver.snapshot(), None, [], indices, 0.0, None)]
+        while work:
+            state, step, codes, group, elapsed, capped_elapsed = work.pop()
+            node_start = time.perf_counter()
+            solver.restore(state)
+            if step is not None:
+                solver.incorporate_feedback(*step)
             guess = solver.solve_csp()
+            attempts = len(solver.guesses) + 1
+            guesses = list(solver.guesses)
+
+            # (answer indices, their feedback codes, solved) of the targets whose game ends here
+            finished = []
+            children = []
             if guess is None:
                 # no candidate -> fail early
-                break
-
-            feedback = generate_wordle_feedback(target, guess)
+                finished.append((group, codes, False))
+            else:
+                guesses.append(guess)
+                targets = [answers[i] for i in group]
+                if patterns is not None:
+                    group_codes = [patterns.code(t, guess) for t in targets]
+                elif len(targets) <= _SCALAR_GROUP:
+                    group_codes = [encode_feedback(generate_wordle_feedback(t, guess)) for t in targets]
+                else:
+                    group_codes = feedback_codes(guess, targets).tolist()
+                buckets = defaultdict(list)
+                for i, code in zip(group, group_codes):
+                    buckets[code].append(i)
+                node_state = None
+                for code, bucket in buckets.items():
+                    if code == solved_code or attempts >= max_guesses:
+                        finished.append((bucket, codes + [code], code == solved_code))
+                    else:
+                        if node_state is None:
+                            node_state = solver.snapshot()
+                        children.append((node_state, (guess, decode_pattern(code, letters_number)),
+                                         codes + [code], bucket))
+            elapsed += (time.perf_counter() - node_start) / len(group)
+            if attempts == time_cap:
+                capped_elapsed = elapsed
+
+            work.extend((s, g, c, b, elapsed, capped_elapsed) for s, g, c, b in children)
+            for bucket, bucket_codes, solved in finished:
+                for i in bucket:
+                    pending[i] = {
+                        'target': answers[i],
+                        'solved': solved,
+                        'attempts': attempts,
+                        'guesses': list(guesses),
+                        'feedback': list(bucket_codes),
+                        'time_seconds': elapsed,
+                    }
+                    if time_cap is not None and attempts > time_cap:
+                        pending[i]['capped_time_seconds'] = capped_elapsed
+
+            # hand out every record whose predecessors are all done
+            while next_index in pending:
+                record = pending.pop(next_index)
+                next_index += 1
+                wins += record['solved']
+                yield record
+                if progress and next_index % 100 == 0:
+                    print(f"Simulated {next_index} games... wins so far: {wins}")
+
+
+# Per-process state of simulation workers, filled by _init_worker
+_WORKER = {}
+
+
+def _init_worker(max_guesses: int, patterns, lengths: list, solver_options: dict, profile: bool):
+    # Warm start: build (or, after fork, simply reuse) the lexicon and one solver per length
+    solvers = {n: make_solver(n, **solver_options) for n in lengths}
+    _WORKER.update(max_guesses=max_guesses, patterns=patterns, solvers=solvers, profile=profile)
+
+
+def _play_chunk(chunk: list) -> list:
+    return play_games(chunk, max_guesses=_WORKER['max_guesses'], patterns=_WORKER['patterns'],
+                      solvers=_WORKER['solvers'], progress=False, profile=_WORKER['profile'])
+
+
+def iter_games_parallel(answers: list, workers: int, max_guesses: int = 6, patterns=None,
+                        solver_options: dict = None, profile: bool = False):
+    """Same as iter_games, with the answer list split across a process pool.
+
+    Chunks are contiguous and collected in submission order, so the records come back in
+    exactly the order a serial run would produce them.
+    """
+    from multiprocessing import Pool
 
+    lengths = sorted({len(t) for t in answers})
+    # Build lexicons before forking so workers inherit them instead of reloading the word lists
+    for n in lengths:
+        get_lexicon(n)
 
-            # solver will record guess when incorporate_feedback is called
-            solver.incorporate_feedback(guess, feedback)
+    chunk_size = max(1, -(-len(answers) // (workers * 4)))
+    chunks = [answers[i:i + chunk_size] for i in range(0, len(answers), chunk_size)]
 
-            if all(f == 'GREEN' for f in feedback):
-                solved = True
-                break
+    played = 0
+    wins = 0
+    with Pool(workers, initializer=_init_worker,
+              initargs=(max_guesses, patterns, lengths, solver_options or {}, profile)) as pool:
+        for chunk_records in pool.imap(_play_chunk, chunks):
+            before = played
+            played += len(chunk_records)
+            wins += sum(r['solved'] for r in chunk_records)
+            yield from chunk_records
+            if played // 100 > before // 100:
+                print(f"Simulated {played} games... wins so far: {wins}")
+
+
+def summarize_games(records, total_elapsed: float = None) -> dict:
+    """Aggregate per-game records (in answer order) into the simulation results dict.
+
+    records may be any iterable, e.g. a stream read back from a results file; it is consumed
+    once and only the failed words are kept in memory. Without total_elapsed the total time
+    is the sum of the per-game times.
+    """
+    total = 0
+    wins = 0
+    guess_total = 0
+    distribution = defaultdict(int)
+    failed_words = []
+    time_total = 0.0
+    profiles = ProfileMerger()
+    has_profiles = False
 
-        if solved:
+    for record in records:
+        total += 1
+        if record['solved']:
             wins += 1
-            guess_counts.append(attempts)
-            distribution[attempts] += 1
+            guess_total += record['attempts']
+            distribution[record['attempts']] += 1
         else:
-            failed_words.append(target)
+            failed_words.append(record['target'])
             distribution['fail'] += 1
-
-        # record elapsed time for this game
-        game_elapsed = time.perf_counter() - game_start
-        game_times.append(game_elapsed)
-
-        # simple progress every 100 games
-        if total % 100 == 0:
-            print(f"Simulated {total} games... wins so far: {wins}")
+        time_total += record['time_seconds']
+        if 'phases' in record:
+            profiles.add(record['phases'])
+            has_profiles = True
 
     winrate = (wins / total) * 100 if total else 0
-    avg_guesses = mean(guess_counts) if guess_counts else float('nan')
-    total_elapsed = time.perf_counter() - total_start
-    avg_time_per_game = mean(game_times) if game_times else float('nan')
+    avg_guesses = guess_total / wins if wins else float('nan')
+    avg_time_per_game = time_total / total if total else float('nan')
+    if total_elapsed is None:
+        total_elapsed = time_total
 
     results = {
         'total': total,
@@ -151,10 +381,171 @@ def simulate(answers: list, max_guesses: int = 6, limit: int = None):
         'distribution': dict(distribution),
         'failed_words': failed_words,
     }
+    if has_profiles:
+        results['phases'] = profiles.result()
+
+    return results
+
 
+def simulate(answers: list, max_guesses: int = 6, limit: int = None, engine: str = 'python', patterns=None,
+             strategy: str = 'frequency', workers: int = 1, books: dict = None, trees: dict = None,
+             profile: bool = False, sink=None, shared: bool = False, cache_size: int = 0):
+    """Play every answer with a CSP solver and collect metrics.
+
+    patterns: optional patterns.PatternMatrix; when given, feedback is looked up in the
+    precomputed table instead of being computed by generate_wordle_feedback.
+    workers: number of processes; results are identical to a serial run apart from timings.
+    books: optional mapping letters_number -> opening_book.OpeningBook for the chosen strategy.
+    trees: optional mapping letters_number -> decision_tree.DecisionTree; games are then played
+    from the compiled tree, falling back to the CSP solver off-tree.
+    profile: record per-phase solver timings (results['phases']).
+    shared: walk the answers as a trie of shared game states (iter_games_shared) instead of
+    replaying every game; same records, in one process, without per-game profiles.
+    cache_size: memoize solver guesses by constraint state in an LRU cache of this many states
+    (per process); serial runs report the statistics of their own lookups in results['solve_cache'].
+    sink: optional results_stream.ResultsSink that receives every game record as it finishes;
+    targets the sink already holds (from a resumed run) are skipped, and the returned metrics
+    cover only the games played by this call.
+    """
+    if limit:
+        answers = answers[:limit]
+    if sink is not None:
+        answers = [a for a in answers if a not in sink.completed]
+    solver_options = {'engine': engine, 'strategy': strategy, 'books': books, 'trees': trees,
+                      'cache_size': cache_size}
+
+    if shared and (workers > 1 or profile):
+        raise ValueError('Shared-state simulation runs in one process and does not support profiling.')
+
+    cache_before = None
+    if cache_size > 0 and workers <= 1:
+        from solve_cache import get_solve_cache
+        # The cache is process-wide: report only this run's lookups
+        cache_before = get_solve_cache(cache_size).stats()
+
+    total_start = time.perf_counter()
+    if shared:
+        records = iter_games_shared(answers, max_guesses=max_guesses, patterns=patterns,
+                                    solver_options=solver_options)
+    elif workers > 1 and len(answers) > 1:
+        records = iter_games_parallel(answers, workers, max_guesses=max_guesses, patterns=patterns,
+                                      solver_options=solver_options, profile=profile)
+    else:
+        records = iter_games(answers, max_guesses=max_guesses, patterns=patterns, solver_options=solver_options,
+                             profile=profile)
+    if sink is not None:
+        records = sink.tee(records)
+    results = summarize_games(records, total_elapsed=None)
+    results['total_time_seconds'] = time.perf_counter() - total_start
+    if cache_before is not None:
+        from solve_cache import get_solve_cache, stats_since
+        results['solve_cache'] = stats_since(cache_before, get_solve_cache(cache_size).stats())
     return results
 
 
+# An exhaustive run (--exhaustive) plays every word of the valid lists: about 52k games over the
+# three lengths. It should sustain this rate so all of them finish in about a minute.
+EXHAUSTIVE_TARGET_GAMES_PER_SECOND = 1000
+# Exhaustive games go on past max_guesses, up to this depth, to measure the true worst case
+EXHAUSTIVE_MAX_DEPTH = 50
+
+
+def cap_record(record: dict, max_guesses: int) -> dict:
+    """The record the same (deterministic) game produces when it is stopped after max_guesses.
+
+    A longer game's time is that of its first max_guesses guesses, which needs the record's
+    'capped_time_seconds' (iter_games_shared with time_cap=max_guesses); the key is dropped.
+    """
+    if 'capped_time_seconds' in record:
+        record = dict(record)
+        capped_time = record.pop('capped_time_seconds')
+    else:
+        capped_time = record['time_seconds']
+    if record['attempts'] <= max_guesses:
+        return record
+    return dict(record, solved=False, attempts=max_guesses, guesses=record['guesses'][:max_guesses],
+                feedback=record['feedback'][:max_guesses], time_seconds=capped_time)
+
+
+def depth_percentiles(distribution: dict, quantiles=(0.5, 0.9, 0.99, 0.999)) -> dict:
+    """Guess count at each quantile of a {depth: games} distribution ('fail' sorts last)."""
+    depths = sorted(distribution, key=lambda d: (d == 'fail', d if d != 'fail' else 0))
+    total = sum(distribution.values())
+    result = {}
+    for q in quantiles:
+        seen = 0
+        for depth in depths:
+            seen += distribution[depth]
+            if seen >= q * total:
+                result[f'p{q * 100:g}'] = depth
+                break
+    return result
+
+
+def exhaustive(letters_number: int, max_guesses: int = 6, engine: str = 'bitset', strategy: str = 'frequency',
+               books: dict = None, cache_size: int = 0, sink=None,
+               target_games_per_second: float = EXHAUSTIVE_TARGET_GAMES_PER_SECOND,
+               progress_every: int = 5000) -> dict:
+    """Play every word of the n-letter valid list and report depth, tail and throughput.
+
+    Games run on the shared-state walk (iter_games_shared) without a guess limit (up to
+    EXHAUSTIVE_MAX_DEPTH) so the worst case is measured, and are then capped at max_guesses for
+    the usual metrics; the records are exactly those of a normal run with that limit.
+    """
+    words = list(get_lexicon(letters_number).words)
+    if sink is not None:
+        words = [w for w in words if w not in sink.completed]
+    solver_options = {'engine': engine, 'strategy': strategy, 'books': books, 'cache_size': cache_size}
+    # uncapped guess counts of every game
+    depths = defaultdict(int)
+
+    def capped(records):
+        wins = 0
+        for played, record in enumerate(records, 1):
+            depths[record['attempts'] if record['solved'] else 'fail'] += 1
+            capped_record = cap_record(record, max_guesses)
+            wins += capped_record['solved']
+            if progress_every and played % progress_every == 0:
+                print(f"Simulated {played} of {len(words)} games... wins so far: {wins}")
+            yield capped_record
+
+    total_start = time.perf_counter()
+    records = capped(iter_games_shared(words, max_guesses=EXHAUSTIVE_MAX_DEPTH, progress=False,
+                                       solver_options=solver_options, time_cap=max_guesses))
+    if sink is not None:
+        records = sink.tee(records)
+    results = summarize_games(records)
+    elapsed = time.perf_counter() - total_start
+
+    solved_depths = [d for d in depths if d != 'fail']
+    results['total_time_seconds'] = elapsed
+    results['depth_distribution'] = {d: depths[d] for d in sorted(depths, key=lambda d: (d == 'fail', d if d != 'fail' else 0))}
+    results['worst_case_depth'] = max(solved_depths) if solved_depths else None
+    results['depth_percentiles'] = depth_percentiles(depths)
+    # share of games needing more than k guesses, for every k from max_guesses - 2 upwards
+    results['tail_percent'] = {
+        k: sum(n for d, n in depths.items() if d == 'fail' or d > k) / len(words) * 100 if words else 0.0
+        for k in range(max(1, max_guesses - 2), (results['worst_case_depth'] or max_guesses) + 1)
+    }
+    results['games_per_second'] = len(words) / elapsed if elapsed else 0.0
+    results['throughput_target'] = target_games_per_second
+    results['meets_throughput_target'] = results['games_per_second'] >= target_games_per_second
+    return results
+
+
+def print_exhaustive(results: dict, max_guesses: int):
+    print('\nExhaustive run:')
+    print(f"Worst-case depth: {results['worst_case_depth']} guesses")
+    print('Depth percentiles: ' + ', '.join(f"{q} = {d}" for q, d in results['depth_percentiles'].items()))
+    print('Tail (games needing more than k guesses):')
+    for k, percent in results['tail_percent'].items():
+        marker = '  <- limit' if k == max_guesses else ''
+        print(f"  > {k}: {percent:.3f}%{marker}")
+    status = 'met' if results['meets_throughput_target'] else 'MISSED'
+    print(f"Throughput: {results['games_per_second']:.0f} games/s "
+          f"(target {results['throughput_target']:.0f} games/s: {status})")
+
+
 def pretty_print(results):
     print('\nSimulation results:')
     print(f"Total games: {results['total']}")
@@ -170,6 +561,31 @@ def pretty_print(results):
     for k in sorted(results['distribution'].keys(), key=lambda x: (x=='fail', x)):
         print(f"  {k}: {results['distribution'][k]}")
     print(f"\nFailed words ({len(results['failed_words'])}): {results['failed_words'][:20]}{'...' if len(results['failed_words'])>20 else ''}")
+    if 'solve_cache' in results:
+        stats = results['solve_cache']
+        print(f"\nSolve cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate'] * 100:.1f}% hit rate), "
+              f"{stats['evictions']} evictions, {stats['size']}/{stats['maxsize']} states")
+    if 'phases' in results:
+        print_phases(results['phases'])
+
+
+def print_phases(phases: dict):
+    """Per-phase solver timings collected with --profile."""
+    print('\nSolver phases (totals over all games):')
+    for phase, seconds in phases['totals'].items():
+        calls = phases['calls'].get(phase, 0)
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        print(f"  {phase:<19} {seconds:10.3f} s  {calls:8d} calls  {per_call:10.1f} us/call")
+    if phases.get('rule_steps'):
+        from propagation import RULES
+        print('\nPropagation pruning steps per rule:')
+        for rule in RULES:
+            print(f"  {rule:<19} {phases['rule_steps'].get(rule, 0):10d}")
+    print('\nSolver phases per guess (mean ms per game reaching that guess):')
+    names = list(phases['totals'].keys())
+    print('  guess  games  ' + '  '.join(f"{p:>19}" for p in names))
+    for k, (means, games) in enumerate(zip(phases['per_guess_mean'], phases['per_guess_games']), 1):
+        print(f"  {k:5d}  {games:5d}  " + '  '.join(f"{means.get(p, 0.0) * 1000:19.3f}" for p in names))
 
 
 def main():
@@ -178,17 +594,99 @@ def main():
     parser.add_argument('--max-guesses', type=int, default=6)
     parser.add_argument('--limit', type=int, help='Limit number of answers to simulate (for quick tests)')
     parser.add_argument('--save-csv', type=str, help='Optional path to save per-word results CSV')
+    parser.add_argument('--engine', type=str, choices=['python', 'numpy', 'bitset'],
+                        help='Candidate-filtering engine used by the CSP solver '
+                             '(default: python, or bitset with --exhaustive)')
+    parser.add_argument('--strategy', type=str, default='frequency', choices=list(STRATEGIES),
+                        help='Guess-selection strategy used by the CSP solver')
+    parser.add_argument('--pattern-cache', action='store_true',
+                        help='Look feedback up in a precomputed, cached guess x answer pattern matrix')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Number of worker processes to split the answer list across')
+    parser.add_argument('--opening-book', action='store_true',
+                        help='Use (and build if needed) the persisted opening book for the first two guesses')
+    parser.add_argument('--decision-tree', action='store_true',
+                        help='Play from a compiled decision tree over the answer list (compiled if needed)')
+    parser.add_argument('--profile', action='store_true',
+                        help='Record per-phase solver timings and include them in the output')
+    parser.add_argument('--shared-states', action='store_true',
+                        help='Compute each distinct game state once for all targets that reach it')
+    parser.add_argument('--solve-cache', type=int, default=0, metavar='SIZE',
+                        help='Memoize solver guesses for up to SIZE distinct constraint states (LRU)')
+    parser.add_argument('--exhaustive', action='store_true',
+                        help='Play every word of valid_words_{n}letter.txt and report worst-case depth, '
+                             'the tail of the distribution and throughput')
+    parser.add_argument('--results-out', type=str,
+                        help='Stream every game (guesses, feedback, time) to this .jsonl or .csv file as it finishes')
+    parser.add_argument('--resume', action='store_true',
+                        help='With --results-out, keep the games already in the file and play only the rest')
     parser.add_argument('--plot', type=str, help='Optional path to save distribution bar chart PNG', default="yes")
 
     args = parser.parse_args()
     letters_number = args.letters_number
+    if args.engine is None:
+        args.engine = 'bitset' if args.exhaustive else 'python'
+    if args.exhaustive and (args.pattern_cache or args.decision_tree or args.workers > 1 or args.profile):
+        parser.error('--exhaustive runs the shared-state walk in one process; it cannot be combined with '
+                     '--pattern-cache, --decision-tree, --workers or --profile')
+    if args.shared_states and (args.workers > 1 or args.profile):
+        parser.error('--shared-states runs in one process; it cannot be combined with --workers or --profile')
     answers = load_answers(f'word_lists/wordle_answers_{letters_number}letter.txt')
     if not answers:
         print('No letters_number loaded.')
         sys.exit(1)
 
-    results = simulate(answers, max_guesses=args.max_guesses, limit=args.limit)
+    patterns = None
+    if args.pattern_cache:
+        from patterns import load_pattern_matrix
+        patterns = load_pattern_matrix(letters_number, answers)
+
+    books = None
+    if args.opening_book:
+        from opening_book import load_opening_book
+        books = {letters_number: load_opening_book(letters_number, args.strategy)}
+
+    trees = None
+    if args.decision_tree:
+        from decision_tree import load_decision_tree
+        trees = {letters_number: load_decision_tree(letters_number, args.strategy, answers)}
+
+    if args.resume and not args.results_out:
+        parser.error('--resume requires --results-out')
+
+    sink = None
+    if args.results_out:
+        from results_stream import ResultsSink
+        sink = ResultsSink(args.results_out, resume=args.resume)
+        if sink.completed:
+            print(f"Resuming {args.results_out}: {len(sink.completed)} games already done")
+
+    try:
+        if args.exhaustive:
+            results = exhaustive(letters_number, max_guesses=args.max_guesses, engine=args.engine,
+                                 strategy=args.strategy, books=books, cache_size=args.solve_cache, sink=sink)
+        else:
+            results = simulate(answers, max_guesses=args.max_guesses, limit=args.limit, engine=args.engine,
+                               patterns=patterns, strategy=args.strategy, workers=args.workers,
+                               books=books, trees=trees, profile=args.profile, sink=sink,
+                               shared=args.shared_states, cache_size=args.solve_cache)
+    finally:
+        if sink is not None:
+            sink.close()
+
+    if sink is not None:
+        # Report on the whole stream, including games from earlier (resumed) runs
+        from results_stream import iter_results
+        session = results
+        results = summarize_games(iter_results(args.results_out))
+        # run-level figures (cache statistics, exhaustive depth and throughput) cover this run only
+        for key, value in session.items():
+            results.setdefault(key, value)
+        print(f"\nStreamed {results['total']} games to {args.results_out} "
+              f"({session['total_time_seconds']:.3f} s in this run)")
     pretty_print(results)
+    if args.exhaustive:
+        print_exhaustive(results, args.max_guesses)
 
     # Optionally create a bar chart of guess distribution (numeric guess counts only)
     if args.plot:
@@ -211,6 +709,24 @@ def main():
                 writer.writerow(['average_time_per_game_seconds', f"{results['average_time_per_game_seconds']:.6f}"])
             writer.writerow(['distribution', str(results['distribution'])])
             writer.writerow(['failed_words_count', len(results['failed_words'])])
+            # depth and throughput of an --exhaustive run
+            if 'worst_case_depth' in results:
+                writer.writerow(['worst_case_depth', results['worst_case_depth']])
+                writer.writerow(['depth_distribution', str(results['depth_distribution'])])
+                writer.writerow(['games_per_second', f"{results['games_per_second']:.2f}"])
+                writer.writerow(['throughput_target', results['throughput_target']])
+                writer.writerow(['meets_throughput_target', results['meets_throughput_target']])
+            # per-phase solver timings when --profile was given
+            if 'phases' in results:
+                phases = results['phases']
+                for phase, seconds in phases['totals'].items():
+                    writer.writerow([f'phase_total_seconds.{phase}', f"{seconds:.6f}"])
+                    writer.writerow([f'phase_calls.{phase}', phases['calls'].get(phase, 0)])
+                for rule, n in phases.get('rule_steps', {}).items():
+                    writer.writerow([f'propagation_steps.{rule}', n])
+                for k, means in enumerate(phases['per_guess_mean'], 1):
+                    for phase, seconds in means.items():
+                        writer.writerow([f'phase_guess{k}_mean_seconds.{phase}', f"{seconds:.6f}"])
 
 
 if __name__ == '__main__':
@@ -1,21 +1,55 @@
+import argparse
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
 import nltk
-from nltk.stem import WordNetLemmatizer
-from nltk.corpus import wordnet
-import spacy
 
-nlp = spacy.load("en_core_web_sm") # if got error: python -m spacy download en_core_web_sm
+from utils import load_word_file
+
+# Persistent word -> (noun lemma, verb lemma) cache, so reruns only lemmatize new words.
+# It is keyed by the NLTK version; a different version may lemmatize differently.
+LEMMA_CACHE_PATH = 'lemma_cache/lemmas.json'
+LEMMA_CACHE_VERSION = 1
+# Words sent to a worker per task
+_CHUNK_SIZE = 2000
+
+# Loaded on first use only: the spaCy model is slow to load and only is_proper_noun_spacy needs it,
+# and each process (main or pool worker) builds its own lemmatizer once
+_nlp = None
+_lemmatizer = None
+
+
+def ensure_wordnet():
+    try:
+        nltk.data.find('corpora/wordnet')
+    except LookupError:
+        nltk.download('wordnet')
+        nltk.download('omw-1.4')
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        import spacy
+        _nlp = spacy.load("en_core_web_sm") # if got error: python -m spacy download en_core_web_sm
+    return _nlp
+
+
+def get_lemmatizer():
+    global _lemmatizer
+    if _lemmatizer is None:
+        from nltk.stem import WordNetLemmatizer
+        _lemmatizer = WordNetLemmatizer()
+    return _lemmatizer
 
-try:
-    nltk.data.find('corpora/wordnet')
-except LookupError:
-    nltk.download('wordnet')
-    nltk.download('omw-1.4')
 
 def is_proper_noun_spacy(word, sentence=None):
     """
     Uses spaCy token.pos_ == 'PROPN' or token.tag_ in ('NNP','NNPS').
     If sentence provided, finds the matching token; otherwise tags the word alone.
     """
+    nlp = get_nlp()
     text = sentence if sentence else word
     doc = nlp(text)
     for token in doc:
@@ -30,20 +64,20 @@ def is_proper_noun_spacy(word, sentence=None):
     return t.pos_ == "PROPN" or t.tag_ in ("NNP", "NNPS") or bool(t.ent_type_)
 
 def load_words_file(filepath='word_lists/valid_words.txt'):
-    """Load all valid words"""
-    with open(filepath, 'r') as file:
-        word_list = [line.strip().lower() for line in file.readlines()]
-    return word_list
+    """Load all valid words (lowercased, like eda_analysis.load_words)"""
+    return load_word_file(filepath)
 
 # def is_english_word(word):
 #     """Check if word exists in WordNet (real English word)"""
 #     return len(wordnet.synsets(word)) > 0
 
-def is_regular_plural(word):
-    """Check if word is a REGULAR plural"""
-    lemmatizer = WordNetLemmatizer()
-    lemma = lemmatizer.lemmatize(word, pos='n')
-    
+def lemmatize(word: str) -> Tuple[str, str]:
+    """(noun lemma, verb lemma) of word, with this process's lemmatizer."""
+    lemmatizer = get_lemmatizer()
+    return lemmatizer.lemmatize(word, pos='n'), lemmatizer.lemmatize(word, pos='v')
+
+def is_plural_of(word, lemma):
+    """Check if word is a REGULAR plural of its noun lemma"""
     if lemma != word:
         if word == lemma + 's':
             return True
@@ -51,14 +85,11 @@ def is_regular_plural(word):
             return True
         if lemma.endswith('y') and word == lemma[:-1] + 'ies':
             return True
-    
+
     return False
 
-def is_regular_past_tense(word):
-    """Check if word is a REGULAR past tense"""
-    lemmatizer = WordNetLemmatizer()
-    lemma = lemmatizer.lemmatize(word, pos='v')
-    
+def is_past_tense_of(word, lemma):
+    """Check if word is a REGULAR past tense of its verb lemma"""
     if lemma != word and word.endswith('ed'):
         if word == lemma + 'ed':
             return True
@@ -68,13 +99,87 @@ def is_regular_past_tense(word):
             return True
         if lemma.endswith('y') and word == lemma[:-1] + 'ied':
             return True
-    
+
     return False
 
-def filter_by_wordle_rules(word_list, word_length):
-    """Filter words by Wordle answer rules"""
+def is_regular_plural(word):
+    """Check if word is a REGULAR plural"""
+    return is_plural_of(word, get_lemmatizer().lemmatize(word, pos='n'))
+
+def is_regular_past_tense(word):
+    """Check if word is a REGULAR past tense"""
+    return is_past_tense_of(word, get_lemmatizer().lemmatize(word, pos='v'))
+
+
+def load_lemma_cache(path: str = LEMMA_CACHE_PATH) -> Dict[str, List[str]]:
+    """Cached lemmas, or an empty dict if the file is missing or was written by another NLTK."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get('version') != LEMMA_CACHE_VERSION or data.get('nltk') != nltk.__version__:
+        return {}
+    return data['lemmas']
+
+
+def save_lemma_cache(lemmas: Dict[str, List[str]], path: str = LEMMA_CACHE_PATH) -> None:
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': LEMMA_CACHE_VERSION, 'nltk': nltk.__version__, 'lemmas': lemmas}, f,
+                  separators=(',', ':'), sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _lemmatize_chunk(words: List[str]) -> List[Tuple[str, str, str]]:
+    return [(w,) + lemmatize(w) for w in words]
+
+
+def lemmatize_words(words: Sequence[str], workers: int = 1) -> Dict[str, List[str]]:
+    """word -> [noun lemma, verb lemma] for every word, split across a process pool if workers > 1."""
+    chunks = [list(words[i:i + _CHUNK_SIZE]) for i in range(0, len(words), _CHUNK_SIZE)]
+    lemmas = {}
+    done = 0
+    if workers > 1 and len(chunks) > 1:
+        from multiprocessing import Pool
+        with Pool(workers, initializer=get_lemmatizer) as pool:
+            results = pool.imap_unordered(_lemmatize_chunk, chunks)
+            for chunk in results:
+                for word, noun, verb in chunk:
+                    lemmas[word] = [noun, verb]
+                done += len(chunk)
+                print(f"  Lemmatized {done:,} of {len(words):,} words")
+    else:
+        for chunk in chunks:
+            for word, noun, verb in _lemmatize_chunk(chunk):
+                lemmas[word] = [noun, verb]
+            done += len(chunk)
+            print(f"  Lemmatized {done:,} of {len(words):,} words")
+    return lemmas
+
+
+def split_by_length(word_list, lengths):
+    """Route every word to its length's list in one pass; other lengths are only counted."""
+    by_length = {n: [] for n in lengths}
+    skipped = 0
+    for word in word_list:
+        bucket = by_length.get(len(word))
+        if bucket is None:
+            skipped += 1
+        else:
+            bucket.append(word)
+    return by_length, skipped
+
+
+def filter_by_wordle_rules(word_list, word_length, lemmas: Optional[Dict[str, List[str]]] = None):
+    """Filter words by Wordle answer rules
+
+    lemmas: optional word -> [noun lemma, verb lemma] map (see lemmatize_words); words missing
+    from it are lemmatized on the spot.
+    """
     filtered = []
-    
+
     print(f"\nProcessing {word_length}-letter words")
     count = 0
     count_skipped_past = 0
@@ -86,26 +191,27 @@ def filter_by_wordle_rules(word_list, word_length):
         if len(word) != word_length:
             count_skipped_len += 1
             continue
-        
+
         count += 1
         if count % 1000 == 0:
             print(f"  Processed {count} words")
-        
+
         # if not is_english_word(word):
         #     continue
-        
+
         # if is_proper_noun_spacy(word):
         #     count_skipped_prop += 1
         #     continue
-        
-        if is_regular_plural(word):
+
+        noun, verb = lemmas[word] if lemmas is not None and word in lemmas else lemmatize(word)
+        if is_plural_of(word, noun):
             count_skipped_reg += 1
             continue
-        
-        if is_regular_past_tense(word):
+
+        if is_past_tense_of(word, verb):
             count_skipped_past += 1
             continue
-        
+
         filtered.append(word)
     # print(f"  Skipped {count_skipped_eng} non-English words")
     print(f"  Skipped {count_skipped_prop} proper nouns")
@@ -115,41 +221,50 @@ def filter_by_wordle_rules(word_list, word_length):
     return filtered
 
 def main():
+    parser = argparse.ArgumentParser(description='Rebuild word_lists/valid_words_{n}letter.txt from valid_words.txt')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes used to lemmatize words missing from the lemma cache')
+    parser.add_argument('--lemma-cache', type=str, default=LEMMA_CACHE_PATH)
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not update the lemma cache')
+    args = parser.parse_args()
+
     print("\nLoading word_lists/valid_words.txt")
     word_list = load_words_file()
     print(f"Total words: {len(word_list):,}")
-    
+
     print("Rules: (1) Real English word (2) No proper nouns (3) No regular plurals (4) No regular past tense")
-    
-    answers_5 = filter_by_wordle_rules(word_list, 5)
-    print(f"✓ 5-letter valid answers: {len(answers_5):,}")
-    
-    answers_6 = filter_by_wordle_rules(word_list, 6)
-    print(f"✓ 6-letter valid answers: {len(answers_6):,}")
-    
-    answers_7 = filter_by_wordle_rules(word_list, 7)
-    print(f"✓ 7-letter valid answers: {len(answers_7):,}")
-    
+
+    by_length, skipped = split_by_length(word_list, args.letters_number)
+    print(f"Skipped {skipped:,} words of other lengths")
+
+    lemmas = {} if args.no_cache else load_lemma_cache(args.lemma_cache)
+    missing = sorted({w for words in by_length.values() for w in words if w not in lemmas})
+    print(f"\nLemma cache: {len(lemmas):,} words cached, {len(missing):,} to lemmatize")
+    if missing:
+        ensure_wordnet()
+        lemmas.update(lemmatize_words(missing, workers=args.workers))
+        if not args.no_cache:
+            save_lemma_cache(lemmas, args.lemma_cache)
+            print(f"✓ Saved lemma cache to {args.lemma_cache}")
+
+    answers = {}
+    for n, words in by_length.items():
+        answers[n] = filter_by_wordle_rules(words, n, lemmas)
+        print(f"✓ {n}-letter valid answers: {len(answers[n]):,}")
+
     print("\nSaving filtered lists")
-    
-    with open('word_lists/valid_words_5letter.txt', 'w') as f:
-        for word in sorted(answers_5):
-            f.write(word + '\n')
-    print(f"✓ Saved {len(answers_5):,} words to answers_5letter.txt")
-    
-    with open('word_lists/valid_words_6letter.txt', 'w') as f:
-        for word in sorted(answers_6):
-            f.write(word + '\n')
-    print(f"✓ Saved {len(answers_6):,} words to answers_6letter.txt")
-    
-    with open('word_lists/valid_words_7letter.txt', 'w') as f:
-        for word in sorted(answers_7):
-            f.write(word + '\n')
-    print(f"✓ Saved {len(answers_7):,} words to answers_7letter.txt")
-    
-    print("\nFirst 50 5-letter answers:")
-    for i, word in enumerate(sorted(answers_5)[:50], 1):
-        print(f"  {i:2}. {word}")
+
+    for n, words in answers.items():
+        with open(f'word_lists/valid_words_{n}letter.txt', 'w') as f:
+            for word in sorted(words):
+                f.write(word + '\n')
+        print(f"✓ Saved {len(words):,} words to answers_{n}letter.txt")
+
+    if 5 in answers:
+        print("\nFirst 50 5-letter answers:")
+        for i, word in enumerate(sorted(answers[5])[:50], 1):
+            print(f"  {i:2}. {word}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,163 @@
+from typing import List, Dict, Tuple, Sequence
+from collections import Counter, defaultdict
+import hashlib
+from functools import cached_property
+from types import MappingProxyType
+
+from utils import load_valid_words
+
+
+def compute_max_letter_counts(words: Sequence[str], letters_number: int) -> Dict[str, int]:
+    """Compute the maximum number of occurrences of each letter across the word list."""
+    max_counts = defaultdict(int)
+    for w in words:
+        w = w.strip()
+        if len(w) != letters_number:
+            continue
+        counts = Counter(w)
+        for letter, c in counts.items():
+            max_counts[letter] = max(max_counts[letter], c)
+    return dict(max_counts)
+
+
+def positional_frequencies(words: Sequence[str], letters_number: int) -> List[Dict[str, int]]:
+    """Return frequency counts of letters per position.
+    Used to order domain values by positional frequency (LCV / heuristic).
+    """
+    freqs = [defaultdict(int) for _ in range(letters_number)]
+    for w in words:
+        w = w.strip()
+        if len(w) != letters_number:
+            continue
+        for i, c in enumerate(w):
+            freqs[i][c] += 1
+    return freqs
+
+
+def word_list_hash(*word_lists: Sequence[str]) -> str:
+    """Stable hash of one or more word lists, used to key cache files."""
+    h = hashlib.sha1()
+    for words in word_lists:
+        h.update('\n'.join(words).encode('ascii'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def words_to_matrix(words: Sequence[str], letters_number: int):
+    """(N, L) uint8 NumPy matrix of letter indices (a=0 .. z=25) for equal-length lowercase words."""
+    import numpy as np
+    buf = np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8)
+    return buf.reshape(len(words), letters_number) - ord('a')
+
+
+def letter_count_matrix(matrix):
+    """(N, 26) uint8 occurrences of each letter per row of a letter matrix."""
+    import numpy as np
+    return (matrix[:, :, None] == np.arange(26, dtype=np.uint8)).sum(axis=1, dtype=np.uint8)
+
+
+class LexiconIndex:
+    """Read-only view of one n-letter word list plus the statistics derived from it.
+
+    Everything here depends only on the word list, never on a game, so a single instance
+    is shared by every CSPSolver of that length (see get_lexicon).
+    """
+
+    def __init__(self, words: Sequence[str], letters_number: int):
+        self.letters_number = letters_number
+        self.words: Tuple[str, ...] = tuple(words)
+
+        freqs = positional_frequencies(self.words, letters_number)
+        # Positional frequencies, frozen so solvers cannot modify the shared copy
+        self.freqs: Tuple[MappingProxyType, ...] = tuple(MappingProxyType(dict(f)) for f in freqs)
+        # Initial domains: letters seen at each position, sorted by positional frequency desc
+        self.domains: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(sorted(f.keys(), key=lambda c, f=f: -f[c])) for f in freqs
+        )
+        # Global letter count bounds
+        self.global_max_counts = MappingProxyType(compute_max_letter_counts(self.words, letters_number))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Hash of the word list; derived caches store it to detect a changed list."""
+        return word_list_hash(self.words)
+
+    @cached_property
+    def letter_matrix(self):
+        """(N, L) uint8 matrix of letter indices (a=0 .. z=25), one row per word. Needs NumPy."""
+        matrix = words_to_matrix(self.words, self.letters_number)
+        matrix.flags.writeable = False
+        return matrix
+
+    @cached_property
+    def count_matrix(self):
+        """(N, 26) uint8 matrix with the number of occurrences of each letter per word. Needs NumPy."""
+        matrix = letter_count_matrix(self.letter_matrix)
+        matrix.flags.writeable = False
+        return matrix
+
+    @cached_property
+    def postings(self) -> 'Postings':
+        """Bitset inverted index over this word list (pure Python, see Postings)."""
+        return Postings(self)
+
+
+def _ids_to_bitset(ids: List[int], size: int) -> int:
+    """Pack a list of word ids into an int whose bit i is set when id i is present."""
+    buf = bytearray((size + 7) // 8)
+    for i in ids:
+        buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, 'little')
+
+
+class Postings:
+    """Inverted index mapping constraints to arbitrary-precision int bitsets of word ids.
+
+    - positions[i][letter]: words with letter at position i
+    - at_least[letter][k]: words containing letter at least k times (k = 0 is every word)
+    """
+
+    def __init__(self, lexicon: LexiconIndex):
+        words = lexicon.words
+        size = len(words)
+        self.size = size
+
+        position_ids = [defaultdict(list) for _ in range(lexicon.letters_number)]
+        count_ids = defaultdict(lambda: defaultdict(list))
+        for idx, w in enumerate(words):
+            for i, c in enumerate(w):
+                position_ids[i][c].append(idx)
+            for c, n in Counter(w).items():
+                count_ids[c][n].append(idx)
+
+        self.all = (1 << size) - 1
+        self.positions: Tuple[Dict[str, int], ...] = tuple(
+            {c: _ids_to_bitset(ids, size) for c, ids in p.items()} for p in position_ids
+        )
+        self.at_least: Dict[str, List[int]] = {}
+        for c, by_count in count_ids.items():
+            top = max(by_count)
+            # Accumulate from the highest count down: ">= k" is ">= k+1" plus "exactly k"
+            postings = [0] * (top + 1)
+            acc = 0
+            for k in range(top, 0, -1):
+                acc |= _ids_to_bitset(by_count.get(k, []), size)
+                postings[k] = acc
+            postings[0] = self.all
+            self.at_least[c] = postings
+
+
+# Process-wide cache: letters_number -> LexiconIndex, filled on first use
+_LEXICONS: Dict[int, LexiconIndex] = {}
+
+
+def get_lexicon(letters_number: int = 5) -> LexiconIndex:
+    """Return the shared LexiconIndex for n-letter words, building it on first use."""
+    lexicon = _LEXICONS.get(letters_number)
+    if lexicon is None:
+        lexicon = LexiconIndex(load_valid_words(letters_number=letters_number), letters_number)
+        _LEXICONS[letters_number] = lexicon
+    return lexicon
@@ -0,0 +1,135 @@
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from lexicon import words_to_matrix
+from patterns import build_pattern_matrix, group_size_squares, pattern_dtype
+
+# Default number of second-ply results kept by a LookaheadCache
+DEFAULT_CACHE_SIZE = 200_000
+# First guesses whose one-ply patterns are computed between two deadline checks
+_ONE_PLY_CHUNK = 2
+
+
+class LookaheadCache:
+    """Bounded LRU map from a candidate group (a constraint state) to its best second-ply score.
+
+    The score of a group depends only on the words in it, so entries stay valid across turns,
+    games and forks of a solver. Groups are keyed by a fixed-size digest, so an entry takes a few
+    hundred bytes whatever the group size and maxsize bounds the memory used.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Tuple[int, int, bytes], int]' = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[int, int, bytes]) -> Optional[int]:
+        with self._lock:
+            score = self._entries.get(key)
+            if score is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return score
+
+    def put(self, key: Tuple[int, int, bytes], score: int) -> None:
+        with self._lock:
+            self._entries[key] = score
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+def _best_reply(group: np.ndarray, matrix: np.ndarray, replies: int,
+                cache: Optional[LookaheadCache]) -> int:
+    """Smallest sum of squared feedback-group sizes over group achievable by one more guess,
+    trying the best `replies` words of the group (group holds ascending row indices of matrix)."""
+    rows = matrix[group]
+    key = None
+    if cache is not None:
+        # The group's letters in ranked order identify its words (and so the state); a fixed-size
+        # digest of them keeps every entry small, whatever the group size
+        key = (replies, len(group), hashlib.blake2b(rows.tobytes(), digest_size=16).digest())
+        score = cache.get(key)
+        if score is not None:
+            return score
+    codes = build_pattern_matrix(rows[:replies], rows)
+    score = int(group_size_squares(codes, matrix.shape[1]).min())
+    if key is not None:
+        cache.put(key, score)
+    return score
+
+
+def two_ply_guess(ranked: List[str], pool: int, replies: int, cache: Optional[LookaheadCache] = None,
+                  deadline: Optional[float] = None) -> Tuple[str, Optional[float], bool]:
+    """Pick the guess minimizing the expected number of candidates left after two guesses.
+
+    ranked: candidates sorted by the frequency heuristic, best first. The best `pool` of them are
+    tried as first guesses; after each feedback, the best `replies` candidates of that feedback
+    group are tried as the second guess and the best one is assumed. Returns the guess, its
+    expected remaining candidate count and whether the search completed; ties go to the better
+    one-ply score, then to the earlier guess in ranked order.
+
+    First guesses are tried in order of their one-ply score, and each one's groups from largest
+    to smallest. A group of k candidates leaves at least k in total (each answer counts
+    itself), so a first guess is abandoned as soon as its evaluated groups plus that bound for
+    the rest cannot beat the best guess so far.
+
+    With a deadline (a perf_counter() time) the search stops once it passes and returns the best
+    fully evaluated guess, or the best one-ply guess (with no expected count) if there is none.
+    """
+    letters_number = len(ranked[0])
+    n = len(ranked)
+    matrix = words_to_matrix(ranked, letters_number)
+    first = ranked[:pool]
+    if deadline is None:
+        codes = build_pattern_matrix(matrix[:len(first)], matrix)
+    else:
+        # A few first guesses at a time, so the deadline is checked while the matrix is built
+        codes = np.empty((len(first), n), dtype=pattern_dtype(letters_number))
+        for i in range(0, len(first), _ONE_PLY_CHUNK):
+            if perf_counter() >= deadline:
+                if i == 0:
+                    return first[0], None, False
+                return first[int(group_size_squares(codes[:i], letters_number).argmin())], None, False
+            stop = min(i + _ONE_PLY_CHUNK, len(first))
+            codes[i:stop] = build_pattern_matrix(matrix[i:stop], matrix)
+    one_ply = group_size_squares(codes, letters_number)
+
+    order_by_one_ply = sorted(range(len(first)), key=lambda k: (one_ply[k], k))
+    best, best_score = first[order_by_one_ply[0]], None
+    for k in order_by_one_ply:
+        # Feedback groups of this guess, each in ranked order, largest first
+        order = np.argsort(codes[k], kind='stable')
+        bounds = np.flatnonzero(np.diff(codes[k][order])) + 1
+        groups = sorted(np.split(order, bounds), key=len, reverse=True)
+        total = 0
+        rest = n
+        for group in groups:
+            if len(group) <= 2:
+                # Guessing one of them leaves both answers alone: exactly the lower bound
+                total += rest
+                rest = 0
+                break
+            if deadline is not None and perf_counter() >= deadline:
+                return best, None if best_score is None else best_score / n, False
+            rest -= len(group)
+            total += _best_reply(group, matrix, replies, cache)
+            if best_score is not None and total + rest >= best_score:
+                break
+        if rest == 0 and (best_score is None or total < best_score):
+            best, best_score = first[k], total
+    return best, best_score / n, True
@@ -50,8 +50,7 @@ def main():
 
 
         # Show some diagnostics
-        candidates_count = len([w for w in solver.words if solver._word_matches_domains_and_counts(w)])
-        print(f"Candidates remaining (approx): {candidates_count}")
+        print(f"Candidates remaining (approx): {solver.candidate_count()}")
 
     print("\nGame Over: Maximum guesses reached.")
     print(f"The target word was: {target_word.upper()}")
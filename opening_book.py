@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+from typing import List, Dict, Optional
+
+from lexicon import LexiconIndex, get_lexicon
+from solver import CSPSolver, STRATEGIES
+from wordle_game import generate_wordle_feedback, encode_feedback, decode_pattern
+
+# Bump whenever the file layout or the meaning of an entry changes so stale books are rebuilt
+OPENING_BOOK_VERSION = 1
+OPENING_BOOK_DIR = 'opening_book'
+
+
+def strategy_signature(strategy: str) -> str:
+    """Strategy name plus the parameters that influence its choices."""
+    if strategy == 'entropy':
+        return f'entropy-pool{CSPSolver.ENTROPY_POOL}-sample{CSPSolver.ENTROPY_SAMPLE}'
+    if strategy == 'lookahead':
+        return f'lookahead-pool{CSPSolver.LOOKAHEAD_POOL}-replies{CSPSolver.LOOKAHEAD_REPLIES}'
+    return strategy
+
+
+class OpeningBook:
+    """Precomputed first guess and best second guess for every feedback to it.
+
+    A fresh solver always makes the same first guess for a given word list and strategy, and its
+    second guess depends only on the feedback to that first guess, so both can be looked up.
+    """
+
+    def __init__(self, letters_number: int, strategy: str, fingerprint: str, first: Optional[str],
+                 second: Dict[int, str]):
+        self.letters_number = letters_number
+        self.strategy = strategy
+        self.signature = strategy_signature(strategy)
+        self.fingerprint = fingerprint
+        self.first = first
+        # pattern code of the feedback to the first guess -> second guess
+        self.second = second
+
+    def check_compatible(self, lexicon: LexiconIndex, strategy: str) -> None:
+        if lexicon.letters_number != self.letters_number or lexicon.fingerprint != self.fingerprint:
+            raise ValueError("Opening book was built for a different word list; rebuild it.")
+        if strategy_signature(strategy) != self.signature:
+            raise ValueError(f"Opening book was built for strategy '{self.signature}', not '{strategy_signature(strategy)}'.")
+
+    def lookup(self, guesses: List[str], feedbacks: List[List[str]]) -> Optional[str]:
+        """Book move for the current history, or None when the history is out of book."""
+        if not guesses:
+            return self.first
+        if len(guesses) == 1 and guesses[0] == self.first:
+            return self.second.get(encode_feedback(feedbacks[0]))
+        return None
+
+    def to_json(self) -> dict:
+        return {
+            'version': OPENING_BOOK_VERSION,
+            'letters_number': self.letters_number,
+            'strategy': self.strategy,
+            'signature': self.signature,
+            'word_list_hash': self.fingerprint,
+            'first': self.first,
+            'second': {str(code): guess for code, guess in sorted(self.second.items())},
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> 'OpeningBook':
+        return cls(data['letters_number'], data['strategy'], data['word_list_hash'], data['first'],
+                   {int(code): guess for code, guess in data['second'].items()})
+
+
+def build_opening_book(letters_number: int, strategy: str = 'frequency') -> OpeningBook:
+    """Run the solver's own search for the first guess and for every reachable second position."""
+    lexicon = get_lexicon(letters_number)
+    # the bitset engine needs no NumPy and gives the same candidates as every other engine
+    solver = CSPSolver.from_index(lexicon, engine='bitset', strategy=strategy)
+    first = solver.solve_csp()
+
+    second: Dict[int, str] = {}
+    if first is not None:
+        for code in _reachable_codes(first, lexicon):
+            solver.reset()
+            try:
+                solver.incorporate_feedback(first, decode_pattern(code, letters_number))
+            except ValueError:
+                continue
+            guess = solver.solve_csp()
+            if guess is not None:
+                second[code] = guess
+
+    return OpeningBook(letters_number, strategy, lexicon.fingerprint, first, second)
+
+
+def _reachable_codes(guess: str, lexicon: LexiconIndex) -> List[int]:
+    """Sorted distinct feedback codes guess gets against the words of lexicon.
+
+    Uses the vectorized patterns.feedback_codes when NumPy is installed, so the 'frequency'
+    book can still be built without it.
+    """
+    try:
+        from patterns import feedback_codes
+    except ImportError:
+        return sorted({encode_feedback(generate_wordle_feedback(w, guess)) for w in lexicon.words})
+    return sorted(set(feedback_codes(guess, lexicon.letter_matrix).tolist()))
+
+
+def opening_book_path(letters_number: int, strategy: str, book_dir: str = OPENING_BOOK_DIR) -> str:
+    return os.path.join(book_dir, f'book_{letters_number}letter_{strategy}.json')
+
+
+def load_opening_book(letters_number: int, strategy: str = 'frequency', book_dir: str = OPENING_BOOK_DIR,
+                      rebuild: bool = False) -> OpeningBook:
+    """Load the persisted book, rebuilding it when missing or when the word list or strategy changed."""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+    lexicon = get_lexicon(letters_number)
+    path = opening_book_path(letters_number, strategy, book_dir)
+
+    if not rebuild and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if (data.get('version') == OPENING_BOOK_VERSION
+                and data.get('word_list_hash') == lexicon.fingerprint
+                and data.get('signature') == strategy_signature(strategy)):
+            return OpeningBook.from_json(data)
+
+    book = build_opening_book(letters_number, strategy)
+    os.makedirs(book_dir, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(book.to_json(), f, indent=1)
+    os.replace(tmp_path, path)
+    return book
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute opening books (first and second guesses)')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--strategy', type=str, nargs='+', default=['frequency'], choices=list(STRATEGIES))
+    parser.add_argument('--book-dir', type=str, default=OPENING_BOOK_DIR)
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if an up-to-date book exists')
+    args = parser.parse_args()
+
+    for n in args.letters_number:
+        for strategy in args.strategy:
+            book = load_opening_book(n, strategy, book_dir=args.book_dir, rebuild=args.rebuild)
+            print(f"✓ {n}-letter {strategy} book: first guess '{book.first}', "
+                  f"{len(book.second):,} second guesses -> {opening_book_path(n, strategy, args.book_dir)}")
+
+
+if __name__ == '__main__':
+    main()
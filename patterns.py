@@ -0,0 +1,243 @@
+import argparse
+import os
+from typing import List, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from lexicon import get_lexicon, words_to_matrix, letter_count_matrix, word_list_hash
+from wordle_game import decode_pattern
+
+# Bump whenever the encoding or the file layout changes so stale caches are rebuilt
+PATTERN_CACHE_VERSION = 1
+PATTERN_CACHE_DIR = 'pattern_cache'
+
+# Upper bound on the (guesses x answers x letters) elements processed per block while building
+_BLOCK_ELEMENTS = 4_000_000
+# Strictly upper triangular (L, L) masks by word length, reused by every _pattern_block call
+_UPPER = {}
+
+
+def all_green_code(letters_number: int) -> int:
+    """Pattern code of the all-GREEN feedback, i.e. a solved game."""
+    return 3 ** letters_number - 1
+
+
+def pattern_dtype(letters_number: int):
+    """Smallest unsigned dtype that holds every pattern code for this length."""
+    return np.uint8 if 3 ** letters_number <= 256 else np.uint16
+
+
+def _pattern_block(guesses: np.ndarray, answers: np.ndarray, answer_counts: np.ndarray) -> np.ndarray:
+    """Pattern codes for every (guess, answer) pair of a block, shape (B, N).
+
+    Same rules as wordle_game.generate_wordle_feedback: GREENs are matched first, then a
+    non-GREEN guess letter is YELLOW while unmatched copies of it remain in the answer,
+    consumed from left to right.
+    """
+    letters_number = guesses.shape[1]
+    green = guesses[:, None, :] == answers[None, :, :]                          # (B, N, L)
+    same = (guesses[:, :, None] == guesses[:, None, :]).astype(np.float32)     # (B, L, L), symmetric
+    # Copies of guess letter i already consumed by GREEN matches
+    green_same = green.astype(np.float32) @ same                               # (B, N, L)
+    # Non-GREEN occurrences of guess letter i at earlier positions (they claim copies first)
+    upper = _UPPER.get(letters_number)
+    if upper is None:
+        upper = _UPPER[letters_number] = np.triu(np.ones((letters_number, letters_number), dtype=np.float32), k=1)
+    earlier_mask = same * upper
+    earlier = (~green).astype(np.float32) @ earlier_mask                       # (B, N, L)
+    # Copies of guess letter i in the answer, before GREEN matches are removed
+    total = answer_counts[:, guesses].transpose(1, 0, 2).astype(np.float32)    # (B, N, L)
+    yellow = ~green & (earlier < total - green_same)
+
+    values = green.astype(np.int32) * 2 + yellow
+    weights = 3 ** np.arange(letters_number, dtype=np.int32)
+    return values @ weights
+
+
+def _word_matrix(words, letters_number: int) -> np.ndarray:
+    """Letter matrix of words (lowercased and length-checked once), or words itself if already one."""
+    if isinstance(words, np.ndarray):
+        if words.ndim != 2 or words.shape[1] != letters_number:
+            raise ValueError(f"Expected an (N, {letters_number}) letter matrix, got shape {words.shape}.")
+        return words
+    words = [w.lower() for w in words]
+    if any(len(w) != letters_number for w in words):
+        raise ValueError(f"All words must be {letters_number} letters long.")
+    return words_to_matrix(words, letters_number)
+
+
+def feedback_codes(guess: str, targets) -> np.ndarray:
+    """Pattern codes of one guess against every target, in one vectorized pass.
+
+    targets is a sequence of words or an (N, L) letter matrix such as LexiconIndex.letter_matrix.
+    Element k equals encode_feedback(generate_wordle_feedback(targets[k], guess)).
+    """
+    guess = guess.lower()
+    letters_number = len(guess)
+    answers = _word_matrix(targets, letters_number)
+    codes = np.empty(len(answers), dtype=pattern_dtype(letters_number))
+    guess_row = words_to_matrix([guess], letters_number)
+    block = max(1, _BLOCK_ELEMENTS // letters_number)
+    for start in range(0, len(answers), block):
+        chunk = answers[start:start + block]
+        codes[start:start + len(chunk)] = _pattern_block(guess_row, chunk, letter_count_matrix(chunk))[0]
+    return codes
+
+
+def target_feedback_codes(target: str, guesses) -> np.ndarray:
+    """Pattern codes of every guess against one target; the transpose of feedback_codes.
+
+    Element k equals encode_feedback(generate_wordle_feedback(target, guesses[k])).
+    """
+    target = target.lower()
+    letters_number = len(target)
+    guess_matrix = _word_matrix(guesses, letters_number)
+    answer = words_to_matrix([target], letters_number)
+    answer_counts = letter_count_matrix(answer)
+    codes = np.empty(len(guess_matrix), dtype=pattern_dtype(letters_number))
+    block = max(1, _BLOCK_ELEMENTS // (letters_number * letters_number))
+    for start in range(0, len(guess_matrix), block):
+        chunk = guess_matrix[start:start + block]
+        codes[start:start + len(chunk)] = _pattern_block(chunk, answer, answer_counts)[:, 0]
+    return codes
+
+
+def build_pattern_matrix(guess_words: Sequence[str], answer_words: Sequence[str]) -> np.ndarray:
+    """Full (len(guess_words), len(answer_words)) matrix of feedback pattern codes.
+
+    Either argument may also be an (N, L) letter matrix, as for feedback_codes.
+    """
+    letters_number = next((w.shape[1] if isinstance(w, np.ndarray) else len(w[0])
+                           for w in (guess_words, answer_words) if len(w)), 0)
+    guesses = _word_matrix(guess_words, letters_number)
+    answers = _word_matrix(answer_words, letters_number)
+    answer_counts = letter_count_matrix(answers)
+
+    matrix = np.empty((len(guess_words), len(answer_words)), dtype=pattern_dtype(letters_number))
+    block = max(1, _BLOCK_ELEMENTS // max(1, len(answer_words) * letters_number))
+    for start in range(0, len(guess_words), block):
+        stop = min(start + block, len(guess_words))
+        matrix[start:stop] = _pattern_block(guesses[start:stop], answers, answer_counts)
+    return matrix
+
+
+def pattern_entropies(guess_words: Sequence[str], answer_words: Sequence[str]) -> np.ndarray:
+    """Expected information (bits) of each guess when the answer is uniform over answer_words.
+
+    Patterns are computed in blocks and bucketed with a single bincount per block: each guess row
+    gets its own range of 3**L bins, so the histograms of the whole block come out of one call.
+    """
+    letters_number = len(guess_words[0])
+    n_patterns = 3 ** letters_number
+    guesses = words_to_matrix(guess_words, letters_number)
+    answers = words_to_matrix(answer_words, letters_number)
+    answer_counts = letter_count_matrix(answers)
+
+    entropies = np.empty(len(guess_words), dtype=np.float64)
+    block = max(1, _BLOCK_ELEMENTS // max(1, len(answer_words) * letters_number))
+    for start in range(0, len(guess_words), block):
+        stop = min(start + block, len(guess_words))
+        codes = _pattern_block(guesses[start:stop], answers, answer_counts)
+        offsets = np.arange(stop - start, dtype=np.int64)[:, None] * n_patterns
+        hist = np.bincount((codes + offsets).ravel(), minlength=(stop - start) * n_patterns)
+        p = hist.reshape(stop - start, n_patterns) / len(answer_words)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            entropies[start:stop] = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+    return entropies
+
+
+def group_size_squares(codes: np.ndarray, letters_number: int) -> np.ndarray:
+    """For each row of a pattern matrix, the sum over feedback groups of the squared group size.
+
+    Divided by the number of answers, this is the expected number of answers still possible
+    after that guess, when the answer is uniform over them.
+    """
+    n_patterns = 3 ** letters_number
+    rows = codes.shape[0]
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * n_patterns
+    hist = np.bincount((codes + offsets).ravel(), minlength=rows * n_patterns)
+    return (hist.reshape(rows, n_patterns) ** 2).sum(axis=1)
+
+
+def pattern_cache_path(letters_number: int, guess_words: Sequence[str], answer_words: Sequence[str],
+                       cache_dir: str = PATTERN_CACHE_DIR) -> str:
+    digest = word_list_hash(guess_words, answer_words)[:16]
+    return os.path.join(cache_dir, f'patterns_{letters_number}letter_v{PATTERN_CACHE_VERSION}_{digest}.npy')
+
+
+class PatternMatrix:
+    """Guess x answer feedback lookup table backed by a (memory-mapped) pattern matrix."""
+
+    def __init__(self, guess_words: Sequence[str], answer_words: Sequence[str], matrix: np.ndarray):
+        self.guess_words = tuple(guess_words)
+        self.answer_words = tuple(answer_words)
+        self.matrix = matrix
+        self.letters_number = len(self.guess_words[0]) if self.guess_words else 0
+        self.guess_index: Dict[str, int] = {w: i for i, w in enumerate(self.guess_words)}
+        self.answer_index: Dict[str, int] = {w: i for i, w in enumerate(self.answer_words)}
+        self._decoded: Dict[int, Tuple[str, ...]] = {}
+
+    def code(self, answer: str, guess: str) -> int:
+        """Pattern code of guess against answer (argument order matches generate_wordle_feedback)."""
+        return int(self.matrix[self.guess_index[guess], self.answer_index[answer]])
+
+    def feedback(self, answer: str, guess: str) -> List[str]:
+        """Drop-in replacement for generate_wordle_feedback(answer, guess) on words in the table."""
+        code = self.code(answer, guess)
+        decoded = self._decoded.get(code)
+        if decoded is None:
+            decoded = tuple(decode_pattern(code, self.letters_number))
+            self._decoded[code] = decoded
+        return list(decoded)
+
+    def row(self, guess: str) -> np.ndarray:
+        """Codes of one guess against every answer."""
+        return self.matrix[self.guess_index[guess]]
+
+
+def load_pattern_matrix(letters_number: int, answer_words: Optional[Sequence[str]] = None,
+                        cache_dir: str = PATTERN_CACHE_DIR, rebuild: bool = False) -> PatternMatrix:
+    """Load (or build and cache) the pattern matrix of the n-letter lexicon against answer_words.
+
+    Guesses are the solver's word list; answers default to the same list. The cache file name
+    embeds the format version and a hash of both lists, so any word-list change triggers a rebuild.
+    """
+    guess_words = get_lexicon(letters_number).words
+    answer_words = tuple(answer_words) if answer_words is not None else guess_words
+    path = pattern_cache_path(letters_number, guess_words, answer_words, cache_dir)
+
+    if rebuild or not os.path.exists(path):
+        matrix = build_pattern_matrix(guess_words, answer_words)
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to a temporary file first so an interrupted build never leaves a truncated cache
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+
+    return PatternMatrix(guess_words, answer_words, np.load(path, mmap_mode='r'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Precompute guess x answer feedback pattern matrices')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7])
+    parser.add_argument('--answers', type=str,
+                        help='Answer list template, e.g. word_lists/wordle_answers_{n}letter.txt '
+                             '(default: the full valid word list)')
+    parser.add_argument('--cache-dir', type=str, default=PATTERN_CACHE_DIR)
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild even if a cache file exists')
+    args = parser.parse_args()
+
+    for n in args.letters_number:
+        answers = None
+        if args.answers:
+            with open(args.answers.format(n=n), 'r', encoding='utf-8') as f:
+                answers = [w.strip() for w in f if w.strip()]
+        table = load_pattern_matrix(n, answers, cache_dir=args.cache_dir, rebuild=args.rebuild)
+        print(f"✓ {n}-letter patterns: {table.matrix.shape[0]:,} x {table.matrix.shape[1]:,} "
+              f"({table.matrix.nbytes / 1e6:.1f} MB) -> "
+              f"{pattern_cache_path(n, table.guess_words, table.answer_words, args.cache_dir)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+from collections import Counter, defaultdict
+from time import perf_counter
+from typing import List, Dict
+
+# Solver phases that can be timed (see CSPSolver.profile). incorporate_feedback records the first
+# four; its 'candidate_narrowing' narrows the live set to the new constraints. solve_csp records
+# the last two: 'candidate_listing' decodes the live words (with a deadline it also frequency-scores
+# them, chunk by chunk), and 'scoring' ranks them and picks a guess.
+PHASES = ('count_updates', 'domain_pruning', 'propagation', 'candidate_narrowing', 'candidate_listing', 'scoring')
+
+
+class PhaseProfile:
+    """Accumulates time and call counts per solver phase, in total and per guess.
+
+    A solver only touches its profile when one is attached, so the disabled case costs a
+    single `is not None` test per phase.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        # per_guess[k][phase]: seconds spent on phase while choosing / absorbing guess k+1
+        self.per_guess: List[Dict[str, float]] = []
+        # pruning steps per propagation rule (see propagation.RULES)
+        self.rule_steps: Counter = Counter()
+
+    def record(self, phase: str, start: float, turn: int) -> float:
+        """Charge the time since start to phase for guess index turn; returns now for chaining."""
+        now = perf_counter()
+        elapsed = now - start
+        self.totals[phase] += elapsed
+        self.calls[phase] += 1
+        while len(self.per_guess) <= turn:
+            self.per_guess.append(defaultdict(float))
+        self.per_guess[turn][phase] += elapsed
+        return now
+
+    def to_dict(self) -> dict:
+        return {
+            'totals': dict(self.totals),
+            'calls': dict(self.calls),
+            'per_guess': [dict(d) for d in self.per_guess],
+            'rule_steps': dict(self.rule_steps),
+        }
+
+
+class ProfileMerger:
+    """Combines PhaseProfile.to_dict() results of many games, one game at a time.
+
+    result() gives phase totals and call counts, plus for each guess number the average time
+    per phase over the games that reached that guess.
+    """
+
+    def __init__(self):
+        self.totals: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.guess_sums: List[Dict[str, float]] = []
+        self.guess_games: List[int] = []
+        self.rule_steps: Counter = Counter()
+
+    def add(self, profile: dict) -> None:
+        for phase, seconds in profile['totals'].items():
+            self.totals[phase] += seconds
+        for phase, n in profile['calls'].items():
+            self.calls[phase] += n
+        for k, phases in enumerate(profile['per_guess']):
+            if len(self.guess_sums) <= k:
+                self.guess_sums.append(defaultdict(float))
+                self.guess_games.append(0)
+            self.guess_games[k] += 1
+            for phase, seconds in phases.items():
+                self.guess_sums[k][phase] += seconds
+        self.rule_steps.update(profile.get('rule_steps', {}))
+
+    def result(self) -> dict:
+        per_guess = [{phase: sums[phase] / n for phase in PHASES if phase in sums}
+                     for sums, n in zip(self.guess_sums, self.guess_games)]
+        return {
+            'totals': {phase: self.totals[phase] for phase in PHASES if phase in self.totals},
+            'calls': {phase: self.calls[phase] for phase in PHASES if phase in self.calls},
+            'per_guess_mean': per_guess,
+            'per_guess_games': list(self.guess_games),
+            'rule_steps': dict(self.rule_steps),
+        }
@@ -0,0 +1,82 @@
+from collections import Counter
+from typing import List, Dict, Optional
+
+# Propagation rules, in the order they are applied on every pass:
+#  - 'singleton_count':  k positions fixed to a letter -> the word holds at least k of it (raise min)
+#  - 'count_capacity':   the other letters' minimums leave room for at most L - sum of them (lower max)
+#  - 'absent_letter':    max count 0 -> remove the letter from every domain
+#  - 'exact_count':      as many positions fixed to a letter as its max -> remove it everywhere else
+#  - 'forced_positions': a letter with min count k fits in exactly k positions -> fix it there
+RULES = ('singleton_count', 'count_capacity', 'absent_letter', 'exact_count', 'forced_positions')
+
+
+def propagate(domains: List[List[str]], min_counts: Dict[str, int], max_counts: Dict[str, int],
+              letters_number: int, steps: Optional[Counter] = None) -> Counter:
+    """Apply RULES to the domains and letter-count bounds, in place, until none changes anything.
+
+    Every rule only drops values no consistent word can use, so the set of matching words is
+    unchanged; it is just described more tightly. Raises ValueError as soon as the constraints
+    become unsatisfiable. Returns steps (a fresh Counter if None), incremented by the number of
+    domain values removed or bounds tightened by each rule.
+    """
+    steps = Counter() if steps is None else steps
+    while True:
+        # positions still open to each letter, and how many positions are fixed to it
+        positions: Dict[str, List[int]] = {}
+        fixed = Counter()
+        for i, domain in enumerate(domains):
+            if not domain:
+                raise ValueError(f"Inconsistency: no letter left for position {i}")
+            if len(domain) == 1:
+                fixed[domain[0]] += 1
+            for c in domain:
+                positions.setdefault(c, []).append(i)
+
+        for ch, lo in min_counts.items():
+            if lo > len(positions.get(ch, ())):
+                raise ValueError(f"Inconsistency: letter '{ch}' requires {lo} positions but only "
+                                 f"{len(positions.get(ch, ()))} available")
+
+        for ch, k in fixed.items():
+            if min_counts.get(ch, 0) < k:
+                min_counts[ch] = k
+                steps['singleton_count'] += 1
+
+        total_min = sum(min_counts.values())
+        if total_min > letters_number:
+            raise ValueError(f"Inconsistency: letters require {total_min} positions but only {letters_number} exist")
+        # letters not in any domain cannot occur anyway, so only open letters get their max lowered
+        slack = letters_number - total_min
+        for ch in positions:
+            capacity = slack + min_counts.get(ch, 0)
+            if max_counts.get(ch, 0) > capacity:
+                max_counts[ch] = capacity
+                steps['count_capacity'] += 1
+
+        changed = False
+        for ch, open_positions in positions.items():
+            hi = max_counts.get(ch, 0)
+            if hi == 0:
+                # earlier letters of this pass may have fixed some of these positions already
+                for i in open_positions:
+                    if ch in domains[i]:
+                        domains[i].remove(ch)
+                        steps['absent_letter'] += 1
+                        changed = True
+            elif fixed[ch] > hi:
+                raise ValueError(f"Inconsistency: letter '{ch}' is fixed at {fixed[ch]} positions "
+                                 f"but may occur {hi} times")
+            elif fixed[ch] == hi:
+                for i in open_positions:
+                    if len(domains[i]) > 1 and ch in domains[i]:
+                        domains[i].remove(ch)
+                        steps['exact_count'] += 1
+                        changed = True
+            elif len(open_positions) == min_counts.get(ch, 0):
+                for i in open_positions:
+                    if len(domains[i]) > 1 and ch in domains[i]:
+                        steps['forced_positions'] += len(domains[i]) - 1
+                        domains[i][:] = [ch]
+                        changed = True
+        if not changed:
+            return steps
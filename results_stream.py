@@ -0,0 +1,177 @@
+import csv
+import io
+import json
+import os
+from typing import Iterable, Iterator, Optional
+
+# One row per game. guesses and feedback are space separated in CSV; feedback values are
+# base-3 pattern codes (wordle_game.encode_feedback), one per guess.
+CSV_FIELDS = ['target', 'solved', 'attempts', 'guesses', 'feedback', 'time_seconds', 'phases']
+# Records buffered in memory before they are written out and checkpointed
+DEFAULT_BUFFER_SIZE = 200
+
+
+def results_format(path: str) -> str:
+    """'csv' for a .csv path, else 'jsonl'."""
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def checkpoint_path(path: str) -> str:
+    return path + '.ckpt'
+
+
+def format_record(record: dict, fmt: str) -> str:
+    """One line (with trailing newline) holding a game record."""
+    if fmt == 'jsonl':
+        return json.dumps(record, separators=(',', ':')) + '\n'
+    out = io.StringIO()
+    csv.writer(out, lineterminator='\n').writerow([
+        record['target'],
+        int(record['solved']),
+        record['attempts'],
+        ' '.join(record['guesses']),
+        ' '.join(str(code) for code in record['feedback']),
+        repr(record['time_seconds']),
+        json.dumps(record['phases'], separators=(',', ':')) if 'phases' in record else '',
+    ])
+    return out.getvalue()
+
+
+def parse_csv_row(row: dict) -> dict:
+    record = {
+        'target': row['target'],
+        'solved': row['solved'] == '1',
+        'attempts': int(row['attempts']),
+        'guesses': row['guesses'].split(),
+        'feedback': [int(code) for code in row['feedback'].split()],
+        'time_seconds': float(row['time_seconds']),
+    }
+    if row.get('phases'):
+        record['phases'] = json.loads(row['phases'])
+    return record
+
+
+def _read_checkpoint(path: str) -> Optional[dict]:
+    try:
+        with open(checkpoint_path(path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _committed_size(path: str) -> int:
+    """Bytes of path covered by its checkpoint, or up to the last complete line without one."""
+    size = os.path.getsize(path)
+    checkpoint = _read_checkpoint(path)
+    if checkpoint is not None and checkpoint.get('offset', size + 1) <= size:
+        return checkpoint['offset']
+    # No usable checkpoint: keep everything up to the last newline, scanning back from the end
+    with open(path, 'rb') as f:
+        end = size
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            newline = f.read(end - start).rfind(b'\n')
+            if newline >= 0:
+                return start + newline + 1
+            end = start
+    return 0
+
+
+def iter_results(path: str) -> Iterator[dict]:
+    """Game records of a results file, one at a time (only the checkpointed part if it has one)."""
+    fmt = results_format(path)
+    end = _committed_size(path)
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            for row in csv.DictReader(_lines_until(f, end)):
+                yield parse_csv_row(row)
+        else:
+            for line in _lines_until(f, end):
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _lines_until(f, end: int) -> Iterator[str]:
+    # Text-mode tell() is not usable while iterating, so count the encoded bytes instead
+    read = 0
+    for line in f:
+        read += len(line.encode('utf-8'))
+        if read > end:
+            return
+        yield line
+
+
+class ResultsSink:
+    """Append-only JSONL/CSV file of per-game records with buffered writes and a checkpoint.
+
+    Records are buffered and written in bulk every buffer_size games; after each bulk write
+    the file is fsynced and path + '.ckpt' is updated with the number of games and the byte
+    offset they end at. Opening with resume=True truncates anything written after the last
+    checkpoint (e.g. a half-written line from a crash) and fills `completed` with the targets
+    already recorded; otherwise the file is started afresh.
+    """
+
+    def __init__(self, path: str, resume: bool = False, buffer_size: int = DEFAULT_BUFFER_SIZE):
+        self.path = path
+        self.format = results_format(path)
+        self.buffer_size = max(1, buffer_size)
+        self.completed = set()
+        self.games = 0
+        self._buffer = []
+
+        if resume and os.path.exists(path):
+            offset = _committed_size(path)
+            for record in iter_results(path):
+                self.completed.add(record['target'])
+                self.games += 1
+            self._file = open(path, 'r+b')
+            self._file.truncate(offset)
+            self._file.seek(offset)
+        else:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            self._file = open(path, 'wb')
+            if self.format == 'csv':
+                self._file.write((','.join(CSV_FIELDS) + '\n').encode('utf-8'))
+            self._checkpoint()
+
+    def write(self, record: dict) -> None:
+        self._buffer.append(format_record(record, self.format))
+        self.completed.add(record['target'])
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def tee(self, records: Iterable[dict]) -> Iterator[dict]:
+        """Write every record of records while passing it through; flushes when the stream ends."""
+        try:
+            for record in records:
+                self.write(record)
+                yield record
+        finally:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._file.write(''.join(self._buffer).encode('utf-8'))
+            self.games += len(self._buffer)
+            self._buffer = []
+        self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        tmp_path = checkpoint_path(self.path) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'games': self.games, 'offset': self._file.tell()}, f)
+        os.replace(tmp_path, checkpoint_path(self.path))
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self) -> 'ResultsSink':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
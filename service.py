@@ -0,0 +1,296 @@
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from lexicon import get_lexicon
+from solve_cache import get_solve_cache
+from solver import CSPSolver, STRATEGIES
+from wordle_game import FEEDBACK_VALUES, decode_pattern
+
+# Idle sessions are dropped after this many seconds, and the oldest ones beyond MAX_SESSIONS
+DEFAULT_SESSION_TTL = 600.0
+DEFAULT_MAX_SESSIONS = 10_000
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class Session:
+    """One game in progress: a CSPSolver on the resident lexicon, plus a lock serializing its calls."""
+
+    def __init__(self, solver: CSPSolver):
+        self.solver = solver
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+
+class SolverService:
+    """Resident lexicons, a shared solve cache and a table of per-session solvers.
+
+    Every request is a JSON object with an 'op' and its arguments; handle() returns the JSON
+    response. Requests on different sessions run concurrently (solver work happens in worker
+    threads); requests on the same session are applied in the order they arrive.
+
+    Operations:
+      new_session          {letters_number} -> {session}
+      next_guess           {session, deadline_ms?} -> {guess, completed, stage}; guess is null when no
+                           candidate is left. With a deadline the best guess found in time is returned
+                           and completed tells whether the search finished (see CSPSolver.solve_csp)
+      incorporate_feedback {session, guess, feedback} -> {candidates}; feedback is a list of
+                           GREEN/YELLOW/GRAY or its base-3 pattern code
+      candidates           {session, limit?} -> {count, words}; limit is a non-negative integer
+      close_session        {session}
+      stats                -> sessions, cache statistics, uptime
+    """
+
+    def __init__(self, letters_numbers=(5, 6, 7), engine: str = 'bitset', strategy: str = 'frequency',
+                 ttl: float = DEFAULT_SESSION_TTL, max_sessions: int = DEFAULT_MAX_SESSIONS,
+                 cache_size: int = DEFAULT_CACHE_SIZE, deadline_ms: Optional[float] = None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+        # Paid once at startup so no request ever loads a word list
+        self.lexicons = {n: get_lexicon(n) for n in letters_numbers}
+        self.engine = engine
+        self.strategy = strategy
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # Default time budget of next_guess; a request's own deadline_ms overrides it
+        self.deadline_ms = deadline_ms
+        self.cache = get_solve_cache(cache_size) if cache_size > 0 else None
+        # session id -> Session, least recently used first
+        self.sessions: 'OrderedDict[str, Session]' = OrderedDict()
+        self._ids = itertools.count(1)
+        self.started = time.monotonic()
+        self.evicted = 0
+        # Warm start: build the engines' lazy indexes and cache every opening guess up front
+        for lexicon in self.lexicons.values():
+            CSPSolver.from_index(lexicon, engine=engine, strategy=strategy, cache=self.cache).solve_csp()
+
+    # -- sessions ------------------------------------------------------------------------
+
+    def _touch(self, session_id: str) -> Session:
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown or expired session '{session_id}'")
+        session.last_used = time.monotonic()
+        self.sessions.move_to_end(session_id)
+        return session
+
+    def new_session(self, letters_number: int) -> str:
+        lexicon = self.lexicons.get(letters_number)
+        if lexicon is None:
+            raise ValueError(f"No resident {letters_number}-letter lexicon; loaded: {sorted(self.lexicons)}")
+        solver = CSPSolver.from_index(lexicon, engine=self.engine, strategy=self.strategy, cache=self.cache)
+        session_id = f's{next(self._ids)}'
+        self.sessions[session_id] = Session(solver)
+        while len(self.sessions) > self.max_sessions:
+            # Least recently used first, but never a session a request is working on (see evict_idle)
+            victim = next((sid for sid, s in self.sessions.items()
+                           if sid != session_id and not s.lock.locked()), None)
+            if victim is None:
+                break
+            del self.sessions[victim]
+            self.evicted += 1
+        return session_id
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than the TTL; returns how many were dropped."""
+        cutoff = time.monotonic() - self.ttl
+        expired = [sid for sid, s in self.sessions.items() if s.last_used < cutoff and not s.lock.locked()]
+        for sid in expired:
+            del self.sessions[sid]
+        self.evicted += len(expired)
+        return len(expired)
+
+    async def evict_forever(self) -> None:
+        while True:
+            await asyncio.sleep(max(1.0, self.ttl / 4))
+            self.evict_idle()
+
+    # -- requests ------------------------------------------------------------------------
+
+    @staticmethod
+    def _parse_feedback(feedback, letters_number: int) -> List[str]:
+        if isinstance(feedback, int):
+            if not 0 <= feedback < 3 ** letters_number:
+                raise ValueError(f"Pattern code {feedback} out of range for {letters_number} letters")
+            return decode_pattern(feedback, letters_number)
+        feedback = [str(f).upper() for f in feedback]
+        if len(feedback) != letters_number or any(f not in FEEDBACK_VALUES for f in feedback):
+            raise ValueError(f"Feedback must be {letters_number} of GREEN/YELLOW/GRAY or a pattern code")
+        return feedback
+
+    async def handle(self, request: dict) -> dict:
+        response = {'id': request.get('id')}
+        try:
+            response.update(await self._dispatch(request))
+            response['ok'] = True
+        except (KeyError, ValueError, TypeError) as e:
+            response['ok'] = False
+            response['error'] = str(e.args[0]) if isinstance(e, KeyError) and e.args else str(e)
+        except Exception as e:
+            # Anything else is a bug, but the client must still get its answer
+            response['ok'] = False
+            response['error'] = f'{type(e).__name__}: {e}'
+        return response
+
+    async def _dispatch(self, request: dict) -> dict:
+        op = request.get('op')
+        if op == 'new_session':
+            return {'session': self.new_session(int(request.get('letters_number', 5)))}
+        if op == 'stats':
+            return {
+                'sessions': len(self.sessions),
+                'evicted_sessions': self.evicted,
+                'uptime_seconds': time.monotonic() - self.started,
+                'cache': self.cache.stats() if self.cache is not None else None,
+            }
+        if op not in ('next_guess', 'incorporate_feedback', 'candidates', 'close_session'):
+            raise ValueError(f"Unknown op '{op}'")
+
+        session_id = request.get('session')
+        session = self._touch(session_id)
+        if op == 'close_session':
+            del self.sessions[session_id]
+            return {}
+
+        solver = session.solver
+        async with session.lock:
+            if op == 'next_guess':
+                deadline_ms = request.get('deadline_ms', self.deadline_ms)
+                guess = await asyncio.to_thread(solver.solve_csp,
+                                                None if deadline_ms is None else float(deadline_ms))
+                search = solver.last_search
+                return {'guess': guess, 'completed': search['completed'], 'stage': search['stage']}
+            if op == 'incorporate_feedback':
+                guess = str(request['guess']).lower()
+                if len(guess) != solver.letters_number or not (guess.isascii() and guess.isalpha()):
+                    raise ValueError(f"Guess must be {solver.letters_number} letters a-z")
+                feedback = self._parse_feedback(request['feedback'], solver.letters_number)
+                # Feedback that contradicts the game so far fails halfway through; keep the session usable
+                state = solver.snapshot()
+                try:
+                    await asyncio.to_thread(solver.incorporate_feedback, guess, feedback)
+                except Exception:
+                    solver.restore(state)
+                    raise
+                return {'candidates': solver.candidate_count()}
+            limit = request.get('limit')
+            if limit is not None and (not isinstance(limit, int) or isinstance(limit, bool) or limit < 0):
+                raise ValueError('limit must be a non-negative integer')
+            words = await asyncio.to_thread(solver.candidate_words)
+            return {'count': len(words), 'words': words[:limit] if limit is not None else words}
+
+    async def handle_line(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Request must be a JSON object')
+        except ValueError as e:
+            response = {'id': None, 'ok': False, 'error': f'Bad request: {e}'}
+        else:
+            response = await self.handle(request)
+        return (json.dumps(response) + '\n').encode('utf-8')
+
+
+async def serve_stream(service: SolverService, reader, writer) -> None:
+    """Answer JSON-line requests from one connection; each request runs as its own task."""
+    write_lock = asyncio.Lock()
+    tasks = set()
+
+    async def respond(line: bytes):
+        data = await service.handle_line(line)
+        async with write_lock:
+            writer.write(data)
+            await writer.drain()
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if not line.strip():
+            continue
+        task = asyncio.create_task(respond(line))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+class _Stdio:
+    """StreamReader/StreamWriter stand-in for stdin/stdout; reads happen in a worker thread so
+    they work for pipes, terminals and redirected files alike."""
+
+    async def readline(self) -> bytes:
+        return await asyncio.to_thread(sys.stdin.buffer.readline)
+
+    def write(self, data: bytes) -> None:
+        sys.stdout.buffer.write(data)
+
+    async def drain(self) -> None:
+        sys.stdout.buffer.flush()
+
+
+async def serve_stdio(service: SolverService) -> None:
+    stdio = _Stdio()
+    await serve_stream(service, stdio, stdio)
+
+
+async def run(service: SolverService, host: Optional[str] = None, port: Optional[int] = None,
+              unix_path: Optional[str] = None) -> None:
+    evictor = asyncio.create_task(service.evict_forever())
+
+    async def on_connect(reader, writer):
+        try:
+            await serve_stream(service, reader, writer)
+        finally:
+            writer.close()
+
+    try:
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(on_connect, path=unix_path)
+        elif port is not None:
+            server = await asyncio.start_server(on_connect, host=host, port=port)
+        else:
+            await serve_stdio(service)
+            return
+        where = unix_path if unix_path is not None else f'{host}:{port}'
+        print(f"✓ Solver service listening on {where} (lexicons: {sorted(service.lexicons)})", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+    finally:
+        evictor.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve CSP solver sessions as JSON lines over TCP, a Unix socket '
+                                                 'or stdin/stdout')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='Listen on TCP host:port')
+    parser.add_argument('--unix', type=str, help='Listen on this Unix socket path')
+    parser.add_argument('--letters_number', type=int, nargs='+', default=[5, 6, 7],
+                        help='Word lengths whose lexicons are kept resident')
+    parser.add_argument('--engine', type=str, default='bitset', choices=['python', 'numpy', 'bitset'])
+    parser.add_argument('--strategy', type=str, default='frequency', choices=list(STRATEGIES))
+    parser.add_argument('--ttl', type=float, default=DEFAULT_SESSION_TTL, help='Seconds before an idle session expires')
+    parser.add_argument('--max-sessions', type=int, default=DEFAULT_MAX_SESSIONS)
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE,
+                        help='States kept by the shared solve cache (0 disables it)')
+    parser.add_argument('--deadline-ms', type=float,
+                        help='Default time budget of next_guess; the best guess found in time is returned')
+    args = parser.parse_args()
+
+    service = SolverService(args.letters_number, engine=args.engine, strategy=args.strategy, ttl=args.ttl,
+                            max_sessions=args.max_sessions, cache_size=args.cache_size,
+                            deadline_ms=args.deadline_ms)
+    try:
+        asyncio.run(run(service, host=args.host, port=args.port, unix_path=args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Hashable, Optional, Tuple
+
+# Default number of constraint states kept by the process-wide cache
+DEFAULT_CACHE_SIZE = 100_000
+
+
+class SolveCache:
+    """Bounded LRU map from a canonical constraint state (CSPSolver.state_key) to its chosen guess.
+
+    One cache can be shared by any number of solvers, of any length or strategy: both are part of
+    the key. With store_candidates=True the candidate list of the state is kept as well, so
+    candidate_words() on a known state needs no engine work either.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, store_candidates: bool = False):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.store_candidates = store_candidates
+        # key -> (guess, candidates tuple or None), least recently used first
+        self._entries: 'OrderedDict[Hashable, Tuple[Optional[str], Optional[Tuple[str, ...]]]]' = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Tuple[Optional[str], Optional[Tuple[str, ...]]]]:
+        """(guess, candidates) for key, or None on a miss; a hit marks key as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def peek(self, key: Hashable) -> Optional[Tuple[Optional[str], Optional[Tuple[str, ...]]]]:
+        """Like get, but leaves the counters and the LRU order alone."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: Hashable, guess: Optional[str], candidates=None) -> None:
+        """Store the guess (and, if this cache keeps them, the candidates) chosen for key."""
+        stored = tuple(candidates) if self.store_candidates and candidates is not None else None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (guess, stored)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def resize(self, maxsize: int, store_candidates: Optional[bool] = None) -> None:
+        """Change the capacity (and whether candidates are kept) in place, so every solver holding
+        this cache keeps sharing it; shrinking evicts the least recently used entries."""
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        with self._lock:
+            self.maxsize = maxsize
+            if store_candidates is not None:
+                self.store_candidates = store_candidates
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+def stats_since(before: dict, after: dict) -> dict:
+    """Statistics of the lookups between two SolveCache.stats() results of the same cache.
+
+    The process-wide cache keeps counting across runs; this isolates one of them. size and
+    maxsize are those of after.
+    """
+    hits = after['hits'] - before['hits']
+    misses = after['misses'] - before['misses']
+    return dict(after, hits=hits, misses=misses, evictions=after['evictions'] - before['evictions'],
+                hit_rate=hits / (hits + misses) if hits + misses else 0.0)
+
+
+# Process-wide cache shared by every solver that asks for one (see get_solve_cache)
+_SHARED_CACHE: Optional[SolveCache] = None
+
+
+def get_solve_cache(maxsize: int = DEFAULT_CACHE_SIZE, store_candidates: bool = False) -> SolveCache:
+    """The process-wide SolveCache, created on first use and resized in place if maxsize changed."""
+    global _SHARED_CACHE
+    if _SHARED_CACHE is None:
+        _SHARED_CACHE = SolveCache(maxsize, store_candidates)
+    elif _SHARED_CACHE.maxsize != maxsize or _SHARED_CACHE.store_candidates != store_candidates:
+        # Resizing keeps the most recently used entries, and solvers already holding the cache
+        _SHARED_CACHE.resize(maxsize, store_candidates)
+    return _SHARED_CACHE
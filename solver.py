@@ -1,59 +1,150 @@
-from typing import List, Dict, Tuple, Optional
+from typing import Any, List, Dict, NamedTuple, Tuple, Optional, TYPE_CHECKING
 from collections import Counter, defaultdict
+from time import perf_counter
 import copy
 
-from utils import load_valid_words
+from lexicon import LexiconIndex, get_lexicon, compute_max_letter_counts, positional_frequencies
+from engines import make_engine
+from propagation import propagate
 
+if TYPE_CHECKING:
+    from opening_book import OpeningBook
+    from profiling import PhaseProfile
+    from solve_cache import SolveCache
+    from lookahead import LookaheadCache
 
-def compute_max_letter_counts(words: List[str], letters_number: int) -> Dict[str, int]:
-    """Compute the maximum number of occurrences of each letter across the word list."""
-    max_counts = defaultdict(int)
-    for w in words:
-        w = w.strip()
-        if len(w) != letters_number:
-            continue
-        counts = Counter(w)
-        for letter, c in counts.items():
-            max_counts[letter] = max(max_counts[letter], c)
-    return dict(max_counts)
 
+# Guess-selection strategies:
+#  - 'frequency': highest sum of positional letter frequencies among the candidates (original heuristic)
+#  - 'entropy': highest expected information over the candidate set (needs NumPy)
+#  - 'lookahead': fewest expected candidates left two guesses deep (needs NumPy, see lookahead.py)
+STRATEGIES = ('frequency', 'entropy', 'lookahead')
 
-def positional_frequencies(words: List[str], letters_number: int) -> List[Dict[str, int]]:
-    """Return frequency counts of letters per position.
-    Used to order domain values by positional frequency (LCV / heuristic).
+
+class SolverState(NamedTuple):
+    """Immutable snapshot of a CSPSolver's per-game state (see CSPSolver.snapshot).
+
+    Domains are kept as strings in their current order and letter bounds as (letter, count)
+    pairs in insertion order, so restoring one gives back exactly the same state. The live
+    candidate set is shared, not copied: engines never modify a live set in place.
     """
-    freqs = [defaultdict(int) for _ in range(letters_number)]
-    for w in words:
-        w = w.strip()
-        if len(w) != letters_number:
-            continue
-        for i, c in enumerate(w):
-            freqs[i][c] += 1
-    return freqs
+    domains: Tuple[str, ...]
+    min_counts: Tuple[Tuple[str, int], ...]
+    max_counts: Tuple[Tuple[str, int], ...]
+    guesses: Tuple[str, ...]
+    feedbacks: Tuple[Tuple[str, ...], ...]
+    candidates: Any
 
 
 class CSPSolver:
-    def __init__(self, letters_number: int = 5):
+    # Entropy strategy limits: only the best ENTROPY_POOL candidates by frequency score are scored as
+    # guesses, against at most ENTROPY_SAMPLE evenly spaced candidates as possible answers.
+    ENTROPY_POOL = 100
+    ENTROPY_SAMPLE = 2000
+    # Lookahead strategy limits: the best LOOKAHEAD_POOL candidates by frequency score are tried as
+    # first guesses, and the best LOOKAHEAD_REPLIES candidates of each feedback group as replies.
+    LOOKAHEAD_POOL = 20
+    LOOKAHEAD_REPLIES = 10
+    # Anytime search (solve_csp with deadline_ms): candidates decoded and frequency-scored, and
+    # entropy pool guesses evaluated, between two checks of the deadline
+    SCORE_CHUNK = 250
+    ENTROPY_CHUNK = 10
+
+    def __init__(self, letters_number: int = 5, lexicon: Optional[LexiconIndex] = None, engine: str = 'python',
+                 strategy: str = 'frequency', book: Optional['OpeningBook'] = None,
+                 cache: Optional['SolveCache'] = None):
         self.letters_number = letters_number
-        self.words = load_valid_words(letters_number=letters_number)
+        # Word list and its statistics are shared and read-only; only constraint state is per game
+        if lexicon is None:
+            lexicon = get_lexicon(letters_number)
+        elif lexicon.letters_number != letters_number:
+            raise ValueError(f"Lexicon holds {lexicon.letters_number}-letter words, expected {letters_number}")
+        self.lexicon = lexicon
+        self.words = lexicon.words
+        # Global letter count bounds
+        self.global_max_counts = lexicon.global_max_counts
+        # Candidate-filtering engine ('python', 'numpy' or 'bitset'); all engines give the same candidates
+        self.engine = make_engine(engine, lexicon)
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy '{strategy}'. Choose from: {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        # Optional precomputed first/second guesses, consulted before running any search
+        if book is not None:
+            book.check_compatible(lexicon, strategy)
+        self.book = book
+        # Optional solve_cache.SolveCache mapping state_key() to the chosen guess; may be shared
+        self.cache = cache
+        # Optional profiling.PhaseProfile; when None (the default) no timing is done at all
+        self.profile: Optional['PhaseProfile'] = None
+        # Pruning steps per propagation rule, summed over every game this solver played
+        self.propagation_steps: Counter = Counter()
+        # How the last solve_csp call went (see solve_csp)
+        self.last_search: Optional[dict] = None
+        # Second-ply scores of the lookahead strategy by candidate group, kept across games and forks
+        self.lookahead_cache: Optional['LookaheadCache'] = None
+        if strategy == 'lookahead':
+            from lookahead import LookaheadCache
+            self.lookahead_cache = LookaheadCache()
 
-        # Initial domain: all lowercase letters that appear in word list for that position
-        freqs = positional_frequencies(self.words, letters_number)
-        self.domains: List[List[str]] = []
-        for i in range(letters_number):
-            # sort letters by positional frequency desc so LCV/MRV heuristics have ordered values
-            ordered = sorted(freqs[i].keys(), key=lambda c: -freqs[i][c])
-            self.domains.append(list(ordered))
+        self.reset()
+
+    @classmethod
+    def from_index(cls, lexicon: LexiconIndex, engine: str = 'python', strategy: str = 'frequency',
+                   book: Optional['OpeningBook'] = None, cache: Optional['SolveCache'] = None) -> 'CSPSolver':
+        """Build a solver on top of an already built LexiconIndex."""
+        return cls(letters_number=lexicon.letters_number, lexicon=lexicon, engine=engine, strategy=strategy,
+                   book=book, cache=cache)
+
+    def reset(self) -> None:
+        """Reset the mutable constraint state so the solver can play a new game."""
+        # Initial domain: all letters that appear in word list for that position,
+        # ordered by positional frequency desc so LCV/MRV heuristics have ordered values
+        self.domains: List[List[str]] = [list(d) for d in self.lexicon.domains]
 
-        # Global letter count bounds
-        self.global_max_counts = compute_max_letter_counts(self.words, letters_number)
         # Start with very permissive min_counts = 0 for all letters
         self.min_counts: Dict[str, int] = defaultdict(int)
         # And start max_counts equal to global_max_counts for known letters; unknown letters get 0
         self.max_counts: Dict[str, int] = defaultdict(int, self.global_max_counts)
 
-        # Keep guesses history
+        # Keep guesses history, and the feedback received for each guess
         self.guesses: List[str] = []
+        self.feedbacks: List[List[str]] = []
+
+        # Surviving candidates in the engine's representation, kept in word-list order. Constraints only
+        # ever tighten, so each incorporate_feedback call narrows this set instead of rescanning the lexicon.
+        self._candidates = self.engine.initial()
+
+    def snapshot(self) -> SolverState:
+        """Capture the current constraint state; a few microseconds, nothing word-sized is copied."""
+        return SolverState(
+            tuple(''.join(d) for d in self.domains),
+            tuple(self.min_counts.items()),
+            tuple(self.max_counts.items()),
+            tuple(self.guesses),
+            tuple(tuple(f) for f in self.feedbacks),
+            self._candidates,
+        )
+
+    def restore(self, state: SolverState) -> None:
+        """Return to a state captured by snapshot() (of this solver or one on the same lexicon)."""
+        self.domains = [list(d) for d in state.domains]
+        self.min_counts = defaultdict(int, state.min_counts)
+        self.max_counts = defaultdict(int, state.max_counts)
+        self.guesses = list(state.guesses)
+        self.feedbacks = [list(f) for f in state.feedbacks]
+        self._candidates = state.candidates
+
+    def fork(self) -> 'CSPSolver':
+        """Independent solver at the current state, for what-if branches.
+
+        The fork shares the lexicon, engine, book and cache, so it costs about as much as a
+        snapshot. It starts with no profile and its own propagation step counts.
+        """
+        child = copy.copy(self)
+        child.profile = None
+        child.propagation_steps = Counter()
+        child.restore(self.snapshot())
+        return child
 
     def _update_counts_from_feedback(self, guess: str, feedback: List[str]) -> None:
         """Compute min and max letter counts from a single guess+feedback and merge with global bounds.
@@ -134,24 +225,40 @@ class CSPSolver:
         This performs:
          1. compute min/max letter counts implied by the feedback
          2. apply positional pruning
-         3. perform a light consistency check
+         3. propagate the constraints to a fixpoint (see propagation.RULES), failing fast
+            on inconsistencies
+         4. narrow the surviving candidates to the new constraints
         """
         assert len(guess) == self.letters_number
         assert len(feedback) == self.letters_number
+        profile = self.profile
+        if profile is not None:
+            turn = len(self.guesses)
+            t = perf_counter()
         self.guesses.append(guess)
+        self.feedbacks.append(list(feedback))
 
         # 1) Update min/max counts from this guess
         self._update_counts_from_feedback(guess, feedback)
+        if profile is not None:
+            t = profile.record('count_updates', t, turn)
 
         # 2) Apply positional pruning
         self._apply_feedback_to_domains(guess, feedback)
+        if profile is not None:
+            t = profile.record('domain_pruning', t, turn)
 
-        # 3) Lightweight arc-consistency style checks:
-        #    - For every letter, check that the number of positions that could still hold it >= min_count
-        for ch, min_req in self.min_counts.items():
-            possible_positions = sum(1 for i in range(self.letters_number) if ch in self.domains[i])
-            if possible_positions < min_req:
-                raise ValueError(f"Inconsistency: letter '{ch}' requires {min_req} positions but only {possible_positions} available")
+        # 3) Propagate until no rule prunes anything; tighter domains make step 4 cheaper
+        steps = propagate(self.domains, self.min_counts, self.max_counts, self.letters_number)
+        self.propagation_steps.update(steps)
+        if profile is not None:
+            profile.rule_steps.update(steps)
+            t = profile.record('propagation', t, turn)
+
+        # 4) Only words that survived earlier turns can still match
+        self._candidates = self.engine.narrow(self._candidates, self)
+        if profile is not None:
+            profile.record('candidate_narrowing', t, turn)
 
     def _word_matches_domains_and_counts(self, w: str) -> bool:
         # positional domains
@@ -169,23 +276,171 @@ class CSPSolver:
                 return False
         return True
 
+    def state_key(self) -> tuple:
+        """Canonical, hashable form of the constraint state.
+
+        Histories that leave the same domains and letter bounds get the same key, and the
+        candidates and chosen guess depend on nothing else: domains are compared as letter sets,
+        and only bounds tighter than the defaults (min 0, max from the word list) are included.
+        The word list and strategy are part of the key so one cache can serve any solver.
+        """
+        global_max = self.global_max_counts
+        key = (
+            self.lexicon.fingerprint,
+            self.strategy,
+            tuple(''.join(sorted(d)) for d in self.domains),
+            tuple(sorted((ch, m) for ch, m in self.min_counts.items() if m > 0)),
+            tuple(sorted((ch, m) for ch, m in self.max_counts.items() if m < global_max.get(ch, 0))),
+        )
+        if self.strategy == 'entropy':
+            key += (self.ENTROPY_POOL, self.ENTROPY_SAMPLE)
+        elif self.strategy == 'lookahead':
+            key += (self.LOOKAHEAD_POOL, self.LOOKAHEAD_REPLIES)
+        return key
+
     def candidate_words(self) -> List[str]:
-        return [w for w in self.words if self._word_matches_domains_and_counts(w)]
+        """Return the words still consistent with every feedback seen so far (a copy)."""
+        if self.cache is not None and self.cache.store_candidates:
+            entry = self.cache.peek(self.state_key())
+            if entry is not None and entry[1] is not None:
+                return list(entry[1])
+        return self.engine.words(self._candidates)
+
+    def candidate_count(self) -> int:
+        """Number of surviving candidates, without copying or rescanning them."""
+        return self.engine.count(self._candidates)
 
-    def solve_csp(self) -> Optional[str]:
+    def solve_csp(self, deadline_ms: Optional[float] = None) -> Optional[str]:
         """Greedy selection based on heuristics.
         Run search to find a word consistent with current domains and global min/max counts.
 
         Returns a word (string) or None if inconsistent / no solution.
+
+        With deadline_ms the search becomes anytime: it holds a valid guess from the start (the
+        first candidate) and improves it stage by stage - frequency scoring, then the entropy or
+        lookahead search - returning the best guess so far once the budget is spent. Afterwards
+        self.last_search = {'completed', 'stage', 'elapsed_ms'} tells whether the search ran to
+        the end and which stage the guess came from. Cut-off guesses are not cached.
         """
-        # Quick candidate filter first to speed things up
-        candidates = self.candidate_words()
+        start = perf_counter()
+        deadline = None if deadline_ms is None else start + deadline_ms / 1000
+
+        def finish(guess: Optional[str], stage: str, completed: bool = True) -> Optional[str]:
+            self.last_search = {'completed': completed, 'stage': stage,
+                                'elapsed_ms': (perf_counter() - start) * 1000}
+            return guess
+
+        # Opening turns are the same for every game with this word list and strategy
+        if self.book is not None:
+            guess = self.book.lookup(self.guesses, self.feedbacks)
+            if guess is not None:
+                return finish(guess, 'book')
+
+        # Any earlier game (of any solver sharing the cache) that reached the same state chose this
+        key = None
+        if self.cache is not None:
+            key = self.state_key()
+            entry = self.cache.get(key)
+            if entry is not None:
+                return finish(entry[0], 'cache')
+
+        fallback = None
+        if deadline is not None:
+            # Without candidates there is nothing to fall back on; the normal path says so quickly
+            fallback = self.engine.first(self._candidates)
+            if fallback is not None and perf_counter() >= deadline:
+                return finish(fallback, 'fallback', False)
+
+        profile = self.profile
+        if profile is not None:
+            turn = len(self.guesses)
+            t = perf_counter()
+
+        # prefer candidates that match domains and counts (and exist in dictionary)
+        # score by sum of positional frequencies (higher is better)
+        freqs = self.lexicon.freqs
+        def score_word(w: str) -> int: # heuristic scoring function
+            return sum(freqs[i].get(w[i], 0) for i in range(self.letters_number))
+
+        if deadline is None:
+            # Quick candidate filter first to speed things up
+            candidates = self.engine.words(self._candidates)
+        else:
+            # Decode and score the live set a chunk at a time, checking the budget in between,
+            # and keep the first best-scoring candidate: what the full sort would put first
+            candidates, scores = [], []
+            best_index, best_score = None, None
+            for chunk in self.engine.word_chunks(self._candidates, self.SCORE_CHUNK):
+                if perf_counter() >= deadline:
+                    if best_index is None:
+                        return finish(fallback, 'fallback', False)
+                    return finish(candidates[best_index], 'frequency', False)
+                chunk_scores = [score_word(w) for w in chunk]
+                top = max(range(len(chunk)), key=chunk_scores.__getitem__)
+                if best_score is None or chunk_scores[top] > best_score:
+                    best_index, best_score = len(candidates) + top, chunk_scores[top]
+                candidates.extend(chunk)
+                scores.extend(chunk_scores)
+        # cached candidates keep word-list order, like candidate_words()
+        listed = tuple(candidates) if key is not None and self.cache.store_candidates else None
         # print(f"Candidate words count: {len(candidates)}")
+        if profile is not None:
+            t = profile.record('candidate_listing', t, turn)
         if candidates:
-            # prefer candidates that match domains and counts (and exist in dictionary)
-            # score by sum of positional frequencies (higher is better)
-            freqs = positional_frequencies(self.words, self.letters_number)
-            def score_word(w: str) -> int: # heuristic scoring function
-                return sum(freqs[i].get(w[i], 0) for i in range(self.letters_number))
-            candidates.sort(key=score_word, reverse=True)
-            return candidates[0]
\ No newline at end of file
+            if deadline is None:
+                candidates.sort(key=score_word, reverse=True)
+                best = candidates[0]
+            else:
+                best = candidates[best_index]
+                if self.strategy != 'frequency' and len(candidates) > 2:
+                    if perf_counter() >= deadline:
+                        return finish(best, 'frequency', False)
+                    # The other strategies need NumPy anyway; a stable argsort keeps ties in word-list order
+                    import numpy as np
+                    order = np.argsort(-np.asarray(scores), kind='stable')
+                    candidates = [candidates[i] for i in order.tolist()]
+            stage, completed = 'frequency', True
+            if self.strategy == 'entropy' and len(candidates) > 2:
+                best, completed = self._entropy_guess(candidates, deadline)
+                stage = 'entropy'
+            elif self.strategy == 'lookahead' and len(candidates) > 2:
+                from lookahead import two_ply_guess
+                best, _, completed = two_ply_guess(candidates, self.LOOKAHEAD_POOL, self.LOOKAHEAD_REPLIES,
+                                                   self.lookahead_cache, deadline)
+                stage = 'lookahead'
+            if profile is not None:
+                profile.record('scoring', t, turn)
+            if key is not None and completed:
+                self.cache.put(key, best, listed)
+            return finish(best, stage, completed)
+        if key is not None:
+            self.cache.put(key, None)
+        return finish(None, 'frequency')
+
+    def _entropy_guess(self, ranked: List[str], deadline: Optional[float] = None) -> Tuple[str, bool]:
+        """Pick the guess with the highest expected information over the candidates.
+
+        ranked: candidates sorted by the frequency heuristic; ties keep that order.
+        With a deadline (a perf_counter() time) the pool is scored a few guesses at a time and
+        the best one so far is returned once it passes. Returns (guess, completed).
+        """
+        from patterns import pattern_entropies
+        pool = ranked[:self.ENTROPY_POOL]
+        answers = ranked
+        if len(ranked) > self.ENTROPY_SAMPLE:
+            # Evenly spaced sample in alphabetical order keeps the estimate deterministic
+            ordered = sorted(ranked)
+            step = len(ordered) / self.ENTROPY_SAMPLE
+            answers = [ordered[int(k * step)] for k in range(self.ENTROPY_SAMPLE)]
+        if deadline is None:
+            entropies = pattern_entropies(pool, answers)
+            return pool[int(entropies.argmax())], True
+        best, best_entropy = ranked[0], None
+        for i in range(0, len(pool), self.ENTROPY_CHUNK):
+            if perf_counter() >= deadline:
+                return best, False
+            entropies = pattern_entropies(pool[i:i + self.ENTROPY_CHUNK], answers)
+            k = int(entropies.argmax())
+            if best_entropy is None or entropies[k] > best_entropy:
+                best, best_entropy = pool[i + k], entropies[k]
+        return best, True
@@ -22,6 +22,11 @@ def load_valid_words(letters_number:int=5) -> List[str]:
 
     return n_letter_words
 
+def load_word_file(filepath:str='word_lists/valid_words.txt') -> List[str]:
+    #Loads every word of a one-word-per-line file, stripped and lowercased
+    with open(filepath, 'r') as f:
+        return [line.strip().lower() for line in f.readlines()]
+
 def max_letter_counts(words: List[str], letters_number:int=5) -> Dict[str, int]:
     """Return dict letter -> max count in any 5-letter word from words."""
     maxc = {chr(ord('a')+i): 0 for i in range(26)}
@@ -1,5 +1,10 @@
 import random
-from typing import List, Dict
+from typing import List, Dict, Sequence
+
+# Feedback patterns can be encoded as base-3 integers: position i contributes value * 3**i with
+# GRAY = 0, YELLOW = 1, GREEN = 2, so an all-GREEN answer is 3**letters_number - 1.
+FEEDBACK_VALUES = {'GRAY': 0, 'YELLOW': 1, 'GREEN': 2}
+FEEDBACK_NAMES = ('GRAY', 'YELLOW', 'GREEN')
 
 #Game Setup
 def start_new_game(word_list: List[str]) -> str:
@@ -49,4 +54,21 @@ def generate_wordle_feedback(target_word: str, guess: str) -> List[str]:
         else:
             feedback[i] = 'GRAY'
 
-    return feedback
\ No newline at end of file
+    return feedback
+
+
+def encode_feedback(feedback: Sequence[str]) -> int:
+    """Encode a GREEN/YELLOW/GRAY feedback list as a base-3 integer."""
+    code = 0
+    for i, f in enumerate(feedback):
+        code += FEEDBACK_VALUES[f] * 3 ** i
+    return code
+
+
+def decode_pattern(code: int, letters_number: int) -> List[str]:
+    """Inverse of encode_feedback."""
+    feedback = []
+    for _ in range(letters_number):
+        code, value = divmod(code, 3)
+        feedback.append(FEEDBACK_NAMES[value])
+    return feedback